@@ -0,0 +1,120 @@
+# src/UAA/credentials.py
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import structlog
+
+from src.infrastructure import metrics
+from src.infrastructure.cache import LRUCache
+from src.infrastructure.database import get_session
+from src.infrastructure.platforms_repo import CachedPlatformsRepository
+from src.infrastructure.worker import PollingWorker
+from src.models.connected_platform import ConnectedPlatform
+from .utils import decrypt_token_checked, rotate_token
+
+logger = structlog.get_logger(__name__)
+
+CREDENTIAL_CACHE_MAX_ENTRIES = int(os.getenv("CREDENTIAL_CACHE_MAX_ENTRIES", "5000"))
+CREDENTIAL_CACHE_TTL_SECONDS = float(os.getenv("CREDENTIAL_CACHE_TTL_SECONDS", "300"))
+CREDENTIAL_ROTATION_BATCH_SIZE = int(os.getenv("CREDENTIAL_ROTATION_BATCH_SIZE", "200"))
+CREDENTIAL_ROTATION_INTERVAL = float(os.getenv("CREDENTIAL_ROTATION_INTERVAL", "30"))
+
+@dataclass(frozen=True)
+class Credentials:
+    access_token: Optional[str]
+    refresh_token: Optional[str]
+
+class CredentialRotator(PollingWorker):
+    """
+    Lazily re-encrypts tokens still under an older OAUTH_TOKEN_KEYS key: platforms are
+    queued when their credentials are decrypted and rewritten in batches in the background.
+    """
+
+    name = "credential_rotator"
+
+    def __init__(self, batch_size: int = CREDENTIAL_ROTATION_BATCH_SIZE, poll_interval: float = CREDENTIAL_ROTATION_INTERVAL):
+        super().__init__(batch_size=batch_size, poll_interval=poll_interval)
+        self._pending: Dict[object, ConnectedPlatform] = {}
+        self.stats = {"queued": 0, "rotated": 0, "failed": 0}
+
+    def enqueue(self, cp: ConnectedPlatform) -> None:
+        # bounded: anything dropped is queued again on its next use
+        if cp.id not in self._pending and len(self._pending) < self.batch_size * 10:
+            self._pending[cp.id] = cp
+            self.stats["queued"] += 1
+
+    async def run_once(self) -> int:
+        if not self._pending:
+            return 0
+        batch = [self._pending.pop(cp_id) for cp_id in list(self._pending)[: self.batch_size]]
+        try:
+            updates = [(cp, rotate_token(cp.access_token_enc), rotate_token(cp.refresh_token_enc)) for cp in batch]
+            async with get_session(primary=True) as session:
+                await CachedPlatformsRepository(session).reencrypt_tokens_many(updates)
+        except Exception as e:
+            self.stats["failed"] += len(batch)
+            logger.warning("credential_rotation_failed", count=len(batch), error=str(e))
+            return 0
+        self.stats["rotated"] += len(batch)
+        logger.info("credentials_rotated", count=len(batch))
+        return len(batch)
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "pending": len(self._pending), "running": self.running}
+
+class CredentialCache:
+    """
+    Decrypted ConnectedPlatform credentials, keyed by (id, updated_at): any token update
+    bumps updated_at, so a rewritten row never hits a stale entry. Short TTL and bounded
+    size keep plaintext tokens in memory only briefly.
+    """
+
+    def __init__(self, rotator: CredentialRotator, max_entries: int = CREDENTIAL_CACHE_MAX_ENTRIES, ttl: float = CREDENTIAL_CACHE_TTL_SECONDS):
+        self._cache = LRUCache(max_entries=max_entries, ttl=ttl)
+        self.rotator = rotator
+
+    @staticmethod
+    def _key(cp: ConnectedPlatform):
+        return (cp.id, cp.updated_at)
+
+    def _decrypt(self, cp: ConnectedPlatform) -> Credentials:
+        access, access_stale = decrypt_token_checked(cp.access_token_enc)
+        refresh, refresh_stale = decrypt_token_checked(cp.refresh_token_enc)
+        if access_stale or refresh_stale:
+            self.rotator.enqueue(cp)
+        creds = Credentials(access_token=access, refresh_token=refresh)
+        self._cache.set(self._key(cp), creds)
+        return creds
+
+    def get(self, cp: ConnectedPlatform) -> Credentials:
+        creds = self._cache.get(self._key(cp))
+        if creds is None:
+            creds = self._decrypt(cp)
+        return creds
+
+    def access_token(self, cp: ConnectedPlatform) -> Optional[str]:
+        return self.get(cp).access_token
+
+    def warm(self, cps: Iterable[ConnectedPlatform]) -> Dict[object, Credentials]:
+        """
+        Batch decrypt: credentials for every platform of e.g. a claimed publish batch, each
+        distinct (id, updated_at) decrypted at most once. Returns id -> Credentials.
+        """
+        out: Dict[object, Credentials] = {}
+        for cp in cps:
+            if cp.id not in out:
+                out[cp.id] = self.get(cp)
+        return out
+
+    def decrypt_many(self, cps: List[ConnectedPlatform]) -> List[Credentials]:
+        creds = self.warm(cps)
+        return [creds[cp.id] for cp in cps]
+
+    def snapshot(self) -> dict:
+        return self._cache.snapshot()
+
+credential_rotator = CredentialRotator()
+credential_cache = CredentialCache(credential_rotator)
+metrics.register("credential_cache", credential_cache.snapshot)
+metrics.register("credential_rotator", credential_rotator.snapshot)
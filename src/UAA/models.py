@@ -7,9 +7,9 @@ from pydantic import EmailStr
 from sqlalchemy import String
 
 class User(SQLModel, table=True):
-    id: Optional[uuid.UUID] = Field(default=None, primary_key=True)
-    email: EmailStr = Field(sa_column=Column(String, unique=True, index=True), nullable=False)
-    username: str = Field(sa_column=Column(String, unique=True, index=True), nullable=False)
+    id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
+    email: EmailStr = Field(sa_column=Column(String, unique=True, index=True, nullable=False))
+    username: str = Field(sa_column=Column(String, unique=True, index=True, nullable=False))
     hashed_password: str
     is_active: bool = Field(default=True)
     is_superuser: bool = Field(default=False)
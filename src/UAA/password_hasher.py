@@ -0,0 +1,118 @@
+# src/UAA/password_hasher.py
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+import structlog
+from passlib.context import CryptContext
+
+from src.infrastructure import metrics
+
+logger = structlog.get_logger(__name__)
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "32"))
+PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "5"))
+
+class PasswordHasherBusy(Exception):
+    pass
+
+# --- executed inside the worker processes ---
+_pwd_context: Optional[CryptContext] = None
+
+def _context() -> CryptContext:
+    global _pwd_context
+    if _pwd_context is None:
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
+
+def _hash_job(password: str) -> Tuple[str, float]:
+    started = time.time()
+    return _context().hash(password), started
+
+def _verify_job(plain: str, hashed: str) -> Tuple[bool, float]:
+    started = time.time()
+    try:
+        return _context().verify(plain, hashed), started
+    except Exception:
+        return False, started
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a process pool so hashing never blocks the event loop.
+    At most `workers + queue_limit` jobs are admitted; beyond that, or when a job
+    exceeds `timeout`, PasswordHasherBusy is raised so callers can fail fast (503).
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, queue_limit: int = PASSWORD_HASH_QUEUE_LIMIT, timeout: float = PASSWORD_HASH_TIMEOUT):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        self.stats = {
+            "completed": 0,
+            "rejected": 0,
+            "timeouts": 0,
+            "latency_ms_total": 0.0,
+            "max_latency_ms": 0.0,
+            "queue_wait_ms_total": 0.0,
+            "max_queue_wait_ms": 0.0,
+        }
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self._in_flight >= self.workers + self.queue_limit:
+            self.stats["rejected"] += 1
+            raise PasswordHasherBusy("password hashing pool saturated")
+        self._in_flight += 1
+        submitted = time.time()
+        start = time.monotonic()
+        try:
+            fut = asyncio.get_running_loop().run_in_executor(self._pool(), fn, *args)
+            result, started = await asyncio.wait_for(fut, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            logger.warning("password_hash_timeout", timeout=self.timeout, in_flight=self._in_flight)
+            raise PasswordHasherBusy("password hashing timed out")
+        finally:
+            self._in_flight -= 1
+        latency_ms = (time.monotonic() - start) * 1000
+        queue_wait_ms = max(0.0, (started - submitted) * 1000)
+        self.stats["completed"] += 1
+        self.stats["latency_ms_total"] += latency_ms
+        self.stats["max_latency_ms"] = max(self.stats["max_latency_ms"], latency_ms)
+        self.stats["queue_wait_ms_total"] += queue_wait_ms
+        self.stats["max_queue_wait_ms"] = max(self.stats["max_queue_wait_ms"], queue_wait_ms)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash_job, password)
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return await self._run(_verify_job, plain, hashed)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def snapshot(self) -> dict:
+        done = self.stats["completed"]
+        return {
+            **self.stats,
+            "in_flight": self._in_flight,
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "avg_latency_ms": round(self.stats["latency_ms_total"] / done, 2) if done else 0.0,
+            "avg_queue_wait_ms": round(self.stats["queue_wait_ms_total"] / done, 2) if done else 0.0,
+        }
+
+password_hasher = PasswordHasher()
+metrics.register("password_hasher", password_hasher.snapshot)
@@ -2,10 +2,21 @@
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import select
 from .models import User
+from src.infrastructure.database import after_commit, commit_or_flush
+from src.infrastructure import metrics
+from src.infrastructure.cache import EntityCache, entity_cache, from_snapshot, to_snapshot
+from src.infrastructure.write_behind import WriteBehindBuffer
 from typing import Optional
 import uuid
 from datetime import datetime
 
+async def _invalidate_users(user_ids) -> None:
+    await entity_cache.invalidate([f"user:{user_id}" for user_id in user_ids])
+
+# login timestamps are written behind the request, see record_last_login
+last_login_buffer = WriteBehindBuffer(User, "last_login", on_flush=_invalidate_users)
+metrics.register("last_login_buffer", last_login_buffer.snapshot)
+
 class UserRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -26,14 +37,46 @@ class UserRepository:
         return res.scalar_one_or_none()
 
     async def create(self, user: User) -> User:
+        # id and defaults are generated client-side, so nothing needs reading back
         self.session.add(user)
-        await self.session.commit()
-        await self.session.refresh(user)
+        await commit_or_flush(self.session)
         return user
 
-    async def update_last_login(self, user: User):
-        user.last_login = datetime.utcnow()
-        self.session.add(user)
-        await self.session.commit()
-        await self.session.refresh(user)
+    def record_last_login(self, user: User) -> None:
+        """
+        Buffer the login timestamp; `last_login_buffer` writes it in a later batch.
+        """
+        last_login_buffer.record(user.id, datetime.utcnow())
+
+class CachedUserRepository(UserRepository):
+    """
+    UserRepository with read-through caching of `get_by_id` (used on every authenticated request).
+    Writes invalidate the cached entry on this worker and broadcast it to the others.
+    """
+
+    def __init__(self, session: AsyncSession, cache: Optional[EntityCache] = None):
+        super().__init__(session)
+        self.cache = cache or entity_cache
+
+    @staticmethod
+    def _key(user_id) -> str:
+        return f"user:{user_id}"
+
+    async def _invalidate(self, user_id) -> None:
+        # deferred to the commit inside a unit of work, so no worker re-caches the old row
+        key = self._key(user_id)
+        await after_commit(self.session, lambda: self.cache.invalidate([key]))
+
+    async def get_by_id(self, user_id: uuid.UUID) -> Optional[User]:
+        cached = await self.cache.get(self._key(user_id))
+        if cached is not None:
+            return from_snapshot(User, cached)
+        user = await super().get_by_id(user_id)
+        if user:
+            await self.cache.set(self._key(user_id), to_snapshot(user))
         return user
+
+    async def create(self, user: User) -> User:
+        created = await super().create(user)
+        await self._invalidate(created.id)
+        return created
@@ -0,0 +1,178 @@
+# src/UAA/revocation.py
+import asyncio
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+import structlog
+
+from .token_store import TokenStore
+
+logger = structlog.get_logger(__name__)
+
+REVOCATION_FILTER_ENABLED = os.getenv("REVOCATION_FILTER_ENABLED", "true").lower() == "true"
+REVOCATION_CHANNEL = os.getenv("REVOCATION_CHANNEL", "auth:revocations")
+REVOCATION_MAX_STALENESS_SECONDS = float(os.getenv("REVOCATION_MAX_STALENESS_SECONDS", "5"))
+REVOCATION_RESEED_SECONDS = float(os.getenv("REVOCATION_RESEED_SECONDS", "300"))
+REVOCATION_BLOOM_BITS = int(os.getenv("REVOCATION_BLOOM_BITS", str(1 << 20)))
+REVOCATION_BLOOM_HASHES = int(os.getenv("REVOCATION_BLOOM_HASHES", "7"))
+
+def _now_ts() -> int:
+    # same clock as the `exp` claims minted in utils
+    return int(datetime.utcnow().timestamp())
+
+class BloomFilter:
+    def __init__(self, bits: int = REVOCATION_BLOOM_BITS, hashes: int = REVOCATION_BLOOM_HASHES):
+        self.bits = bits
+        self.hashes = hashes
+        self._array = bytearray((bits + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.bits for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._array[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._array[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+class RevocationFilter:
+    """
+    Per-worker view of revoked access-token jtis: a Bloom filter plus an exact map of
+    jti -> expiry. Seeded from the `bl:*` keys at startup and kept current by the
+    revocation feed that `blacklist_access_jti` publishes to.
+
+    Staleness is bounded: the feed is pinged every half of REVOCATION_MAX_STALENESS_SECONDS
+    and a pong proves every earlier revocation was received. If no pong or message arrived
+    within that bound (feed down, reconnecting, not yet seeded) every check goes to Redis,
+    exactly as before the filter existed.
+    """
+
+    def __init__(self, token_store: TokenStore, channel: str = REVOCATION_CHANNEL, max_staleness: float = REVOCATION_MAX_STALENESS_SECONDS):
+        self.token_store = token_store
+        self.channel = channel
+        self.max_staleness = max_staleness
+        self._bloom = BloomFilter()
+        self._exact: Dict[str, int] = {}
+        self._heartbeat = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"local_negative": 0, "local_positive": 0, "redis_checks": 0, "fallbacks": 0, "feed_messages": 0, "reseeds": 0}
+
+    @property
+    def healthy(self) -> bool:
+        return self._task is not None and not self._task.done() and time.monotonic() - self._heartbeat <= self.max_staleness
+
+    def add(self, jti: str, expires_at_ts: int) -> None:
+        self._exact[jti] = expires_at_ts
+        self._bloom.add(jti)
+
+    async def is_revoked(self, jti: str) -> bool:
+        if not self.healthy:
+            self.stats["fallbacks"] += 1
+            return await self.token_store.is_access_blacklisted(jti)
+        if jti not in self._bloom:
+            self.stats["local_negative"] += 1
+            return False
+        expires_at = self._exact.get(jti)
+        if expires_at is not None and expires_at > _now_ts():
+            self.stats["local_positive"] += 1
+            return True
+        # Bloom false positive or expired entry: let Redis decide
+        self.stats["redis_checks"] += 1
+        return await self.token_store.is_access_blacklisted(jti)
+
+    async def seed(self) -> None:
+        """
+        Rebuild the filter from Redis; also drops entries whose tokens have expired.
+        """
+        now = _now_ts()
+        keys = [key async for key in self.token_store.redis.scan_iter(match="bl:*", count=1000)]
+        ttls = []
+        if keys:
+            async with self.token_store.redis.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.ttl(key)
+                ttls = await pipe.execute()
+        bloom, exact = BloomFilter(), {}
+        for key, ttl in zip(keys, ttls):
+            if ttl is None or ttl <= 0:
+                continue
+            jti = key[len("bl:"):]
+            exact[jti] = now + int(ttl)
+            bloom.add(jti)
+        # keep revocations that arrived while scanning
+        for jti, expires_at in self._exact.items():
+            if expires_at > now and jti not in exact:
+                exact[jti] = expires_at
+                bloom.add(jti)
+        self._bloom, self._exact = bloom, exact
+        self.stats["reseeds"] += 1
+        logger.info("revocation_filter_seeded", revoked=len(exact))
+
+    async def _follow(self) -> None:
+        ping_interval = self.max_staleness / 2
+        pubsub = self.token_store.redis.pubsub()
+        try:
+            await pubsub.subscribe(self.channel)
+            # subscribe first so nothing published during the seed is missed
+            await self.seed()
+            self._heartbeat = last_ping = last_seed = time.monotonic()
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                now = time.monotonic()
+                if message is not None:
+                    if message["type"] == "message":
+                        data = json.loads(message["data"])
+                        self.add(data["jti"], int(data["exp"]))
+                        self.stats["feed_messages"] += 1
+                    self._heartbeat = now
+                if now - last_ping >= ping_interval:
+                    await pubsub.ping()
+                    last_ping = now
+                if now - last_seed >= REVOCATION_RESEED_SECONDS:
+                    await self.seed()
+                    last_seed = now
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+    async def _run(self) -> None:
+        backoff = 1.0
+        while True:
+            started = time.monotonic()
+            try:
+                await self._follow()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._heartbeat = 0.0
+                if time.monotonic() - started > 60:
+                    backoff = 1.0
+                logger.warning("revocation_feed_lost", error=str(e), retry_in=backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "healthy": self.healthy, "revoked": len(self._exact), "enabled": REVOCATION_FILTER_ENABLED}
@@ -8,6 +8,7 @@ from .models import User
 from .repository import UserRepository
 from .schemas import UserCreate
 from . import utils
+from .password_hasher import password_hasher
 
 logger = structlog.get_logger(__name__)
 
@@ -36,29 +37,25 @@ class UserService:
             logger.debug("register_username_exists", username=user_in.username)
             raise ValueError("username already taken")
 
-        hashed = utils.hash_password(user_in.password)
+        hashed = await password_hasher.hash(user_in.password)
         user = User(email=user_in.email, username=user_in.username, hashed_password=hashed)
         created = await self.repo.create(user)
         logger.info("user_registered", user_id=str(created.id), email=created.email)
         return created
 
     async def _is_locked(self, user_id: str) -> bool:
-        key = f"la:lock:{user_id}"
-        return await utils.redis_client.exists(key) == 1
+        return await utils.token_store.is_login_locked(user_id)
 
     async def _increment_login_attempts(self, user_id: str) -> int:
-        key = f"la:attempts:{user_id}"
-        attempts = await utils.redis_client.incr(key)
-        if attempts == 1:
-            await utils.redis_client.expire(key, LOGIN_ATTEMPT_WINDOW_SECONDS)
-        if attempts >= MAX_LOGIN_ATTEMPTS:
-            await utils.redis_client.set(f"la:lock:{user_id}", "1", ex=LOCKOUT_SECONDS)
+        attempts, locked = await utils.token_store.record_failed_login(
+            user_id, LOGIN_ATTEMPT_WINDOW_SECONDS, MAX_LOGIN_ATTEMPTS, LOCKOUT_SECONDS
+        )
+        if locked:
             logger.warning("user_locked_due_to_failed_logins", user_id=user_id)
         return attempts
 
     async def _reset_login_attempts(self, user_id: str) -> None:
-        await utils.redis_client.delete(f"la:attempts:{user_id}")
-        await utils.redis_client.delete(f"la:lock:{user_id}")
+        await utils.token_store.reset_login_attempts(user_id)
 
     async def authenticate_user(self, email: str, password: str) -> Optional[User]:
         user = await self.repo.get_by_email(email)
@@ -70,13 +67,14 @@ class UserService:
             logger.warning("auth_attempt_on_locked_user", user_id=str(user.id))
             raise AuthenticationError("account temporarily locked due to failed login attempts")
 
-        if not utils.verify_password(password, user.hashed_password):
+        if not await password_hasher.verify(password, user.hashed_password):
             attempts = await self._increment_login_attempts(str(user.id))
             logger.info("auth_failed_wrong_password", user_id=str(user.id), attempts=attempts)
             raise AuthenticationError("invalid credentials")
 
         await self._reset_login_attempts(str(user.id))
-        await self.repo.update_last_login(user)
+        # no DB write on the login path: the timestamp is flushed in batches
+        self.repo.record_last_login(user)
         logger.info("auth_success", user_id=str(user.id), email=user.email)
         return user
 
@@ -128,7 +126,7 @@ class UserService:
 
         if access_token:
             try:
-                payload = utils.decode_token(access_token)
+                payload = utils.decode_access_token_cached(access_token)
             except Exception:
                 payload = None
             if payload and payload.get("type") == "access":
@@ -136,6 +134,7 @@ class UserService:
                 exp = payload.get("exp")
                 if jti and exp:
                     await utils.blacklist_access_jti(jti, exp)
+                    utils.forget_access_token(access_token)
                     logger.info("access_blacklisted_on_logout", jti=jti)
     async def request_otp(self, user_id: str, action: str = "login", ttl: int = 300) -> str:
         return await utils.request_otp(user_id, action, ttl)
@@ -0,0 +1,165 @@
+# src/UAA/token_store.py
+import json
+import secrets
+from typing import Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Logical operations are one atomic round trip where possible: a single Redis command or a
+# registered Lua script (EVALSHA, falling back to EVAL on NOSCRIPT). Scripts only touch keys
+# passed in KEYS, so they keep working on Redis Cluster; operations whose key names are only
+# known after a read (refresh revocation) use a read followed by one pipeline instead.
+
+# KEYS: bl:{jti}   ARGV: ttl, revocation channel, feed message
+BLACKLIST_ACCESS_LUA = """
+redis.call('SET', KEYS[1], '1', 'EX', ARGV[1])
+redis.call('PUBLISH', ARGV[2], ARGV[3])
+return 1
+"""
+
+# KEYS: rt:{jti}, rts:{user_id}   ARGV: user_id, jti, ttl
+STORE_REFRESH_LUA = """
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+redis.call('SADD', KEYS[2], ARGV[2])
+if redis.call('TTL', KEYS[2]) < tonumber(ARGV[3]) then
+    redis.call('EXPIRE', KEYS[2], ARGV[3])
+end
+return 1
+"""
+
+# KEYS: otp:rate:{action}:{user}, otp:{action}:{user}, otp:attempts:{action}:{user}
+# ARGV: otp, ttl, rate_ttl
+REQUEST_OTP_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[1], 'EX', ARGV[2])
+redis.call('SET', KEYS[1], '1', 'EX', ARGV[3])
+redis.call('DEL', KEYS[3])
+return 1
+"""
+
+# failed login or OTP attempt
+# KEYS: attempts counter, lock   ARGV: window, max_attempts, lock_ttl
+# returns {attempts, locked}
+RECORD_FAILURE_LUA = """
+local attempts = redis.call('INCR', KEYS[1])
+if attempts == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+local locked = 0
+if attempts >= tonumber(ARGV[2]) then
+    redis.call('SET', KEYS[2], '1', 'EX', ARGV[3])
+    locked = 1
+end
+return {attempts, locked}
+"""
+
+class TokenStore:
+    """
+    Redis-backed store for refresh/access token state, OTPs, OAuth state and
+    login brute-force counters.
+    """
+
+    def __init__(self, redis):
+        self.redis = redis
+        self._blacklist_access = redis.register_script(BLACKLIST_ACCESS_LUA)
+        self._store_refresh = redis.register_script(STORE_REFRESH_LUA)
+        self._request_otp = redis.register_script(REQUEST_OTP_LUA)
+        self._record_failure = redis.register_script(RECORD_FAILURE_LUA)
+
+    # --- access / refresh tokens ---
+    async def blacklist_access(self, jti: str, ttl: int, expires_at_ts: int, channel: str) -> None:
+        """
+        Blacklist an access jti and announce it on the revocation feed in the same step.
+        """
+        message = json.dumps({"jti": jti, "exp": expires_at_ts})
+        await self._blacklist_access(keys=[f"bl:{jti}"], args=[ttl, channel, message])
+
+    async def is_access_blacklisted(self, jti: str) -> bool:
+        return await self.redis.exists(f"bl:{jti}") == 1
+
+    async def store_refresh(self, jti: str, user_id: str, ttl: int) -> None:
+        await self._store_refresh(keys=[f"rt:{jti}", f"rts:{user_id}"], args=[user_id, jti, ttl])
+
+    async def revoke_refresh(self, jti: str) -> Optional[str]:
+        # GETDEL revokes atomically; dropping the jti from the user's set is only bookkeeping
+        user_id = await self.redis.getdel(f"rt:{jti}")
+        if user_id:
+            await self.redis.srem(f"rts:{user_id}", jti)
+        return user_id
+
+    async def is_refresh_valid(self, jti: str) -> bool:
+        return await self.redis.exists(f"rt:{jti}") == 1
+
+    async def revoke_all_refresh(self, user_id: str) -> int:
+        # read and drop the set in one MULTI on its single key, so a refresh token stored
+        # meanwhile lands in a fresh set instead of being lost from it
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.smembers(f"rts:{user_id}")
+            pipe.delete(f"rts:{user_id}")
+            jtis, _ = await pipe.execute()
+        if jtis:
+            # one DEL per key: the keys may live on different cluster slots
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for jti in jtis:
+                    pipe.delete(f"rt:{jti}")
+                await pipe.execute()
+        return len(jtis)
+
+    # --- OTP ---
+    async def create_otp(self, user_id: str, action: str, otp: str, ttl: int, rate_ttl: int) -> bool:
+        """
+        Store an OTP unless the send rate limit is active. Returns False when rate limited.
+        """
+        keys = [f"otp:rate:{action}:{user_id}", f"otp:{action}:{user_id}", f"otp:attempts:{action}:{user_id}"]
+        return await self._request_otp(keys=keys, args=[otp, ttl, rate_ttl]) == 1
+
+    async def check_otp(self, user_id: str, action: str, otp: str, attempts_ttl: int, max_attempts: int, lock_ttl: int) -> Tuple[int, int]:
+        """
+        Returns (status, failed attempts): status 1 verified, 0 wrong code, -1 locked, -2 missing.
+        The code is compared here with `secrets.compare_digest`, not in Redis, so the
+        comparison stays constant-time.
+        """
+        lock_key, otp_key, attempts_key = f"otp:lock:{action}:{user_id}", f"otp:{action}:{user_id}", f"otp:attempts:{action}:{user_id}"
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.exists(lock_key)
+            pipe.get(otp_key)
+            locked, stored = await pipe.execute()
+        if locked:
+            return -1, 0
+        if not stored:
+            return -2, 0
+        if secrets.compare_digest(stored, otp):
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.delete(otp_key)
+                pipe.delete(attempts_key)
+                consumed, _ = await pipe.execute()
+            # a concurrent verify already used the code
+            return (1, 0) if consumed else (-2, 0)
+        attempts, _ = await self._record_failure(keys=[attempts_key, lock_key], args=[attempts_ttl, max_attempts, lock_ttl])
+        return 0, int(attempts)
+
+    # --- OAuth state ---
+    async def put_oauth_state(self, state: str, payload: str, ttl: int) -> None:
+        await self.redis.set(f"oauth_state:{state}", payload, ex=ttl)
+
+    async def pop_oauth_state(self, state: str) -> Optional[str]:
+        # GETDEL: read and consume in one atomic step, so a state can only be used once
+        return await self.redis.getdel(f"oauth_state:{state}")
+
+    # --- login brute-force counters ---
+    async def is_login_locked(self, user_id: str) -> bool:
+        return await self.redis.exists(f"la:lock:{user_id}") == 1
+
+    async def record_failed_login(self, user_id: str, window: int, max_attempts: int, lock_ttl: int) -> Tuple[int, bool]:
+        attempts, locked = await self._record_failure(
+            keys=[f"la:attempts:{user_id}", f"la:lock:{user_id}"],
+            args=[window, max_attempts, lock_ttl],
+        )
+        return int(attempts), bool(locked)
+
+    async def reset_login_attempts(self, user_id: str) -> None:
+        await self.redis.delete(f"la:attempts:{user_id}", f"la:lock:{user_id}")
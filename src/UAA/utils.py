@@ -1,16 +1,22 @@
 # src/UAA/utils.py
 import os
+import hashlib
 import secrets
 import uuid
 import json
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
 import structlog
 import redis.asyncio as aioredis
 from passlib.context import CryptContext
 from jose import jwt, JWTError
-from cryptography.fernet import Fernet, InvalidToken
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+
+from src.infrastructure import metrics
+from src.infrastructure.cache import LRUCache
+from .token_store import TokenStore
+from .revocation import RevocationFilter, REVOCATION_CHANNEL, REVOCATION_FILTER_ENABLED
 
 logger = structlog.get_logger(__name__)
 
@@ -20,16 +26,26 @@ ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+JWT_CACHE_MAX_ENTRIES = int(os.getenv("JWT_CACHE_MAX_ENTRIES", "10000"))
 OAUTH_TOKEN_KEY = os.getenv("OAUTH_TOKEN_KEY")  # must be a base64 key for Fernet, set in prod
+# key rotation: comma-separated Fernet keys, newest first. New tokens are encrypted with the
+# first key, any listed key decrypts; defaults to OAUTH_TOKEN_KEY alone
+OAUTH_TOKEN_KEYS = [k.strip() for k in os.getenv("OAUTH_TOKEN_KEYS", "").split(",") if k.strip()]
 
-if not OAUTH_TOKEN_KEY:
+if not OAUTH_TOKEN_KEYS and not OAUTH_TOKEN_KEY:
     # dev fallback (not for production)
     OAUTH_TOKEN_KEY = Fernet.generate_key().decode()
+if not OAUTH_TOKEN_KEYS:
+    OAUTH_TOKEN_KEYS = [OAUTH_TOKEN_KEY]
 
 # clients
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 redis_client = aioredis.from_url(REDIS_URL, decode_responses=True)
-fernet = Fernet(OAUTH_TOKEN_KEY.encode())
+_primary_fernet = Fernet(OAUTH_TOKEN_KEYS[0].encode())
+fernet = MultiFernet([Fernet(k.encode()) for k in OAUTH_TOKEN_KEYS])
+token_store = TokenStore(redis_client)
+revocation_filter = RevocationFilter(token_store)
+metrics.register("revocation_filter", revocation_filter.snapshot)
 
 # --- Password utilities ---
 def hash_password(password: str) -> str:
@@ -80,43 +96,65 @@ def decode_token(token: str) -> Dict[str, Any]:
         logger.warning("token_decode_failed", error=str(e))
         raise
 
+# verified access-token payloads keyed by sha256(token); each entry expires at the token's exp
+_verified_access_tokens = LRUCache(max_entries=JWT_CACHE_MAX_ENTRIES)
+metrics.register("jwt_cache", _verified_access_tokens.snapshot)
+
+def _token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+def decode_access_token_cached(token: str) -> Dict[str, Any]:
+    """
+    Like decode_token, but skips signature verification and claim parsing for an access
+    token already verified by this worker. Only validity is cached: callers must still
+    run the revocation check (is_access_jti_blacklisted) on every use.
+    """
+    key = _token_digest(token)
+    payload = _verified_access_tokens.get(key)
+    if payload is not None:
+        return dict(payload)
+    payload = decode_token(token)
+    if payload.get("type") == "access" and payload.get("exp"):
+        ttl = payload["exp"] - datetime.utcnow().timestamp()
+        if ttl > 0:
+            _verified_access_tokens.set(key, dict(payload), ttl=ttl)
+    return payload
+
+def forget_access_token(token: str) -> None:
+    _verified_access_tokens.delete(_token_digest(token))
+
 # --- Redis-based blacklists and refresh management ---
 async def blacklist_access_jti(jti: str, expires_at_ts: int) -> None:
     ttl = max(0, expires_at_ts - _now_ts())
     if ttl <= 0:
         return
-    await redis_client.set(f"bl:{jti}", "1", ex=ttl)
+    await token_store.blacklist_access(jti, ttl, expires_at_ts, REVOCATION_CHANNEL)
+    # visible to this worker at once; other workers learn it from the feed
+    revocation_filter.add(jti, expires_at_ts)
     logger.info("access_jti_blacklisted", jti=jti, ttl=ttl)
 
 async def is_access_jti_blacklisted(jti: str) -> bool:
-    return await redis_client.exists(f"bl:{jti}") == 1
+    if REVOCATION_FILTER_ENABLED:
+        return await revocation_filter.is_revoked(jti)
+    return await token_store.is_access_blacklisted(jti)
 
 async def store_refresh_jti(jti: str, user_id: str, expires_at_ts: int) -> None:
     ttl = max(0, expires_at_ts - _now_ts())
     if ttl <= 0:
         raise ValueError("refresh token already expired")
-    await redis_client.set(f"rt:{jti}", user_id, ex=ttl)
-    await redis_client.sadd(f"rts:{user_id}", jti)
-    await redis_client.expire(f"rts:{user_id}", ttl)
+    await token_store.store_refresh(jti, user_id, ttl)
     logger.debug("store_refresh_jti", jti=jti, user_id=user_id, ttl=ttl)
 
 async def revoke_refresh_jti(jti: str) -> None:
-    user_id = await redis_client.get(f"rt:{jti}")
-    await redis_client.delete(f"rt:{jti}")
-    if user_id:
-        await redis_client.srem(f"rts:{user_id}", jti)
+    user_id = await token_store.revoke_refresh(jti)
     logger.info("refresh_jti_revoked", jti=jti, user_id=user_id)
 
 async def is_refresh_valid(jti: str) -> bool:
-    return await redis_client.exists(f"rt:{jti}") == 1
+    return await token_store.is_refresh_valid(jti)
 
 async def revoke_all_refresh_for_user(user_id: str) -> None:
-    set_key = f"rts:{user_id}"
-    jtis = await redis_client.smembers(set_key) or set()
-    for j in jtis:
-        await redis_client.delete(f"rt:{j}")
-    await redis_client.delete(set_key)
-    logger.info("revoke_all_refresh_for_user", user_id=user_id, revoked_count=len(jtis))
+    revoked = await token_store.revoke_all_refresh(user_id)
+    logger.info("revoke_all_refresh_for_user", user_id=user_id, revoked_count=revoked)
 
 # --- OTP scaffold ---
 OTP_LENGTH = 6
@@ -131,43 +169,28 @@ def _generate_numeric_otp(length: int = OTP_LENGTH) -> str:
     return str(secrets.randbelow(range_end - range_start + 1) + range_start)
 
 async def request_otp(user_id: str, action: str = "login", ttl: int = OTP_DEFAULT_TTL) -> str:
-    rate_key = f"otp:rate:{action}:{user_id}"
-    if await redis_client.exists(rate_key):
+    otp_code = _generate_numeric_otp()
+    if not await token_store.create_otp(user_id, action, otp_code, ttl, OTP_SEND_RATE_SECONDS):
         logger.info("otp_request_rate_limited", user_id=user_id, action=action)
         raise RuntimeError("OTP request rate limit exceeded")
-
-    otp_code = _generate_numeric_otp()
-    otp_key = f"otp:{action}:{user_id}"
-    await redis_client.set(otp_key, otp_code, ex=ttl)
-    await redis_client.set(rate_key, "1", ex=OTP_SEND_RATE_SECONDS)
-    await redis_client.delete(f"otp:attempts:{action}:{user_id}")
     logger.info("otp_created", user_id=user_id, action=action, ttl=ttl)
     return otp_code
 
 async def verify_otp(user_id: str, action: str, otp: str) -> bool:
-    lock_key = f"otp:lock:{action}:{user_id}"
-    if await redis_client.exists(lock_key):
+    status, attempts = await token_store.check_otp(
+        user_id, action, otp, OTP_DEFAULT_TTL, OTP_MAX_FAILED_ATTEMPTS, OTP_FAILED_LOCK_SECONDS
+    )
+    if status == -1:
         logger.info("otp_locked", user_id=user_id, action=action)
         return False
-
-    otp_key = f"otp:{action}:{user_id}"
-    stored = await redis_client.get(otp_key)
-    if not stored:
+    if status == -2:
         logger.info("otp_missing", user_id=user_id, action=action)
         return False
-
-    if secrets.compare_digest(stored, otp):
-        await redis_client.delete(otp_key)
-        await redis_client.delete(f"otp:attempts:{action}:{user_id}")
+    if status == 1:
         logger.info("otp_verified", user_id=user_id, action=action)
         return True
 
-    attempts_key = f"otp:attempts:{action}:{user_id}"
-    attempts = await redis_client.incr(attempts_key)
-    if attempts == 1:
-        await redis_client.expire(attempts_key, OTP_DEFAULT_TTL)
     if attempts >= OTP_MAX_FAILED_ATTEMPTS:
-        await redis_client.set(lock_key, "1", ex=OTP_FAILED_LOCK_SECONDS)
         logger.warning("otp_locked_due_to_failed_attempts", user_id=user_id, action=action)
     logger.info("otp_failed_attempt", user_id=user_id, action=action, attempts=attempts)
     return False
@@ -186,22 +209,44 @@ def decrypt_token(ciphertext: Optional[str]) -> Optional[str]:
     except InvalidToken:
         return None
 
+def decrypt_token_checked(ciphertext: Optional[str]) -> Tuple[Optional[str], bool]:
+    """
+    Like decrypt_token, plus whether the ciphertext is under an older key and should be
+    re-encrypted (see rotate_token).
+    """
+    if not ciphertext:
+        return None, False
+    token = ciphertext.encode()
+    try:
+        return _primary_fernet.decrypt(token).decode(), False
+    except InvalidToken:
+        pass
+    try:
+        return fernet.decrypt(token).decode(), True
+    except InvalidToken:
+        return None, False
+
+def rotate_token(ciphertext: Optional[str]) -> Optional[str]:
+    """
+    Re-encrypt a ciphertext under the newest key without exposing the plaintext.
+    """
+    if not ciphertext:
+        return ciphertext
+    return fernet.rotate(ciphertext.encode()).decode()
+
 # OAuth state helpers
 OAUTH_STATE_TTL = 300
 
 async def create_oauth_state(user_id: str, provider: str) -> str:
     state = secrets.token_urlsafe(32)
-    key = f"oauth_state:{state}"
     payload = {"user_id": str(user_id), "provider": provider}
-    await redis_client.set(key, json.dumps(payload), ex=OAUTH_STATE_TTL)
+    await token_store.put_oauth_state(state, json.dumps(payload), OAUTH_STATE_TTL)
     return state
 
 async def pop_oauth_state(state: str) -> Optional[dict]:
-    key = f"oauth_state:{state}"
-    raw = await redis_client.get(key)
+    raw = await token_store.pop_oauth_state(state)
     if not raw:
         return None
-    await redis_client.delete(key)
     try:
         return json.loads(raw)
     except Exception:
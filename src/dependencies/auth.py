@@ -2,21 +2,22 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
-from src.UAA.utils import decode_token, is_access_jti_blacklisted, redis_client
-from src.UAA.repository import UserRepository
-from src.infrastructure.database import get_session
+from src.UAA.utils import decode_access_token_cached, is_access_jti_blacklisted
+from src.UAA.repository import CachedUserRepository
+from src.dependencies.db import get_session_dep
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-async def get_current_user(token: str = Depends(oauth2_scheme), session: AsyncSession = Depends(get_session)):
+async def get_current_user(token: str = Depends(oauth2_scheme), session: AsyncSession = Depends(get_session_dep)):
     try:
-        payload = decode_token(token)
+        payload = decode_access_token_cached(token)
+        # revocation is checked on every request, cached or not
         jti = payload.get("jti")
         if jti and await is_access_jti_blacklisted(jti):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="token revoked")
         user_id = payload.get("sub")
-        repo = UserRepository(session)
+        repo = CachedUserRepository(session)
         user = await repo.get_by_id(user_id)
         if not user:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="user not found")
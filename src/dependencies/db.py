@@ -1,7 +1,21 @@
 # src/dependencies/db.py
 from typing import AsyncGenerator
-from infrastructure.database import get_session
+import structlog
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.infrastructure.database import get_session
 
-async def get_session_dep() -> AsyncGenerator:
+logger = structlog.get_logger(__name__)
+
+async def get_session_dep() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Request-scoped session. FastAPI caches dependencies per request, so the auth
+    dependency, the routers and the services they build all share this one session.
+    The session is lazy: a pool connection is only checked out when the first query
+    runs, so requests answered entirely from caches never touch the pool.
+    `session.info["checkouts"]` counts the connections it actually checked out.
+    """
     async with get_session() as session:
-        yield session
+        try:
+            yield session
+        finally:
+            logger.debug("db_session_closed", checkouts=session.info.get("checkouts", 0))
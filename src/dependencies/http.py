@@ -0,0 +1,13 @@
+# src/dependencies/http.py
+from typing import Callable
+import httpx
+from src.infrastructure.http_clients import http_clients
+
+def get_http_client(name: str) -> Callable[[], httpx.AsyncClient]:
+    """
+    Build a dependency returning the shared pooled client for an integration, e.g.
+    `client: httpx.AsyncClient = Depends(get_http_client("instagram"))`.
+    """
+    def _dep() -> httpx.AsyncClient:
+        return http_clients.get(name)
+    return _dep
@@ -0,0 +1,198 @@
+# src/infrastructure/cache.py
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Type
+
+import structlog
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from src.infrastructure import metrics
+from src.infrastructure.redis_cache import redis_client
+
+logger = structlog.get_logger(__name__)
+
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+CACHE_REDIS_TIER = os.getenv("CACHE_REDIS_TIER", "false").lower() == "true"
+CACHE_REDIS_TTL_SECONDS = int(os.getenv("CACHE_REDIS_TTL_SECONDS", "300"))
+CACHE_INVALIDATION_CHANNEL = os.getenv("CACHE_INVALIDATION_CHANNEL", "cache:invalidate")
+
+class LRUCache:
+    """
+    Bounded in-process LRU with a per-entry TTL. Not thread-safe; meant for one event loop.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.stats["expirations"] += 1
+            self.stats["misses"] += 1
+            return None
+        self._data.move_to_end(key)
+        self.stats["hits"] += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        self._data[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def delete(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def snapshot(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "hit_ratio": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+def to_snapshot(obj) -> Dict[str, Any]:
+    """
+    Plain dict of an ORM instance's column values, safe to keep after its session closes.
+    """
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+
+def from_snapshot(model: Type, data: Dict[str, Any]):
+    """
+    Rebuild an instance from a snapshot as a *detached* object: it can be read freely
+    and, if added to a session, is treated as an existing row (UPDATE, never INSERT).
+    """
+    obj = model.model_validate(data)
+    make_transient_to_detached(obj)
+    return obj
+
+class EntityCache:
+    """
+    Read-through cache for repository lookups: an in-process LRU, optionally backed by
+    Redis as a second tier. Invalidations are applied locally and broadcast to the other
+    workers over Redis pub/sub so their local tiers drop the same keys.
+    """
+
+    def __init__(self, local: Optional[LRUCache] = None, redis_tier: bool = CACHE_REDIS_TIER, channel: str = CACHE_INVALIDATION_CHANNEL):
+        self.local = local or LRUCache()
+        self.redis_tier = redis_tier
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"redis_hits": 0, "redis_errors": 0, "invalidations_sent": 0, "invalidations_received": 0}
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None or not self.redis_tier:
+            return value
+        try:
+            raw = await redis_client.get(f"ec:{key}")
+        except Exception as e:
+            self.stats["redis_errors"] += 1
+            logger.warning("entity_cache_redis_get_failed", key=key, error=str(e))
+            return None
+        if raw is None:
+            return None
+        value = json.loads(raw)
+        self.stats["redis_hits"] += 1
+        self.local.set(key, value)
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        self.local.set(key, value)
+        if not self.redis_tier:
+            return
+        try:
+            await redis_client.set(f"ec:{key}", json.dumps(value, default=str), ex=CACHE_REDIS_TTL_SECONDS)
+        except Exception as e:
+            self.stats["redis_errors"] += 1
+            logger.warning("entity_cache_redis_set_failed", key=key, error=str(e))
+
+    async def invalidate(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        if not keys:
+            return
+        for key in keys:
+            self.local.delete(key)
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                if self.redis_tier:
+                    pipe.delete(*[f"ec:{key}" for key in keys])
+                pipe.publish(self.channel, json.dumps({"origin": self.origin, "keys": keys}))
+                await pipe.execute()
+            self.stats["invalidations_sent"] += 1
+        except Exception as e:
+            # other workers fall back to TTL expiry for these keys
+            self.stats["redis_errors"] += 1
+            logger.warning("entity_cache_invalidate_broadcast_failed", keys=keys, error=str(e))
+
+    async def _listen(self) -> None:
+        backoff = 1.0
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                # invalidations may have been missed while we were not subscribed
+                self.local.clear()
+                backoff = 1.0
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    data = json.loads(message["data"])
+                    if data.get("origin") == self.origin:
+                        continue
+                    for key in data.get("keys", []):
+                        self.local.delete(key)
+                    self.stats["invalidations_received"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("entity_cache_subscription_lost", error=str(e), retry_in=backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> dict:
+        return {**self.local.snapshot(), **self.stats, "redis_tier": self.redis_tier, "subscribed": self._task is not None and not self._task.done()}
+
+entity_cache = EntityCache()
+metrics.register("entity_cache", entity_cache.snapshot)
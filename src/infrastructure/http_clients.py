@@ -0,0 +1,90 @@
+# src/infrastructure/http_clients.py
+import importlib.util
+import os
+from typing import Dict
+
+import httpx
+import structlog
+
+from src.infrastructure import metrics
+
+logger = structlog.get_logger(__name__)
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+# HTTP/2 needs the optional `h2` package (httpx[http2]); fall back to HTTP/1.1 keep-alive without it
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true" and importlib.util.find_spec("h2") is not None
+
+class HttpClientRegistry:
+    """
+    Registry of long-lived, keep-alive httpx clients, one per outbound integration.
+    Each integration gets its own connection pool, so limits apply per upstream host.
+    Clients are opened on app startup and closed on shutdown; `get` also opens a client
+    lazily so standalone workers can use the registry without the FastAPI lifecycle.
+    """
+
+    def __init__(self):
+        self._configs: Dict[str, dict] = {}
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def configure(
+        self,
+        name: str,
+        max_connections: int = HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections: int = HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+        timeout: float = HTTP_TIMEOUT,
+    ) -> None:
+        self._configs[name] = {
+            "max_connections": max_connections,
+            "max_keepalive_connections": max_keepalive_connections,
+            "connect_timeout": connect_timeout,
+            "timeout": timeout,
+        }
+
+    def _build(self, name: str) -> httpx.AsyncClient:
+        cfg = self._configs.get(name) or {}
+        limits = httpx.Limits(
+            max_connections=cfg.get("max_connections", HTTP_MAX_CONNECTIONS),
+            max_keepalive_connections=cfg.get("max_keepalive_connections", HTTP_MAX_KEEPALIVE_CONNECTIONS),
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        )
+        timeout = httpx.Timeout(cfg.get("timeout", HTTP_TIMEOUT), connect=cfg.get("connect_timeout", HTTP_CONNECT_TIMEOUT))
+        logger.info("http_client_opened", name=name, http2=HTTP2_ENABLED, max_connections=limits.max_connections)
+        return httpx.AsyncClient(limits=limits, timeout=timeout, http2=HTTP2_ENABLED)
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._build(name)
+            self._clients[name] = client
+        return client
+
+    async def startup(self) -> None:
+        for name in self._configs:
+            self.get(name)
+
+    async def shutdown(self) -> None:
+        clients, self._clients = self._clients, {}
+        for name, client in clients.items():
+            await client.aclose()
+            logger.info("http_client_closed", name=name)
+
+    def snapshot(self) -> dict:
+        return {name: {"open": not client.is_closed} for name, client in self._clients.items()}
+
+http_clients = HttpClientRegistry()
+http_clients.configure(
+    "telegram",
+    max_connections=int(os.getenv("TELEGRAM_HTTP_MAX_CONNECTIONS", "50")),
+    timeout=float(os.getenv("TELEGRAM_HTTP_TIMEOUT", "30")),
+)
+http_clients.configure(
+    "instagram",
+    max_connections=int(os.getenv("INSTAGRAM_HTTP_MAX_CONNECTIONS", "20")),
+    timeout=float(os.getenv("INSTAGRAM_HTTP_TIMEOUT", "30")),
+)
+metrics.register("http_clients", http_clients.snapshot)
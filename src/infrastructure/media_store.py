@@ -0,0 +1,151 @@
+# src/infrastructure/media_store.py
+import asyncio
+import hashlib
+import json
+import os
+import re
+import uuid
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+import structlog
+
+from src.infrastructure import metrics
+
+logger = structlog.get_logger(__name__)
+
+# local stand-in for an S3-compatible bucket
+MEDIA_ROOT = os.getenv("MEDIA_ROOT", "./media_store")
+# Telegram bots can upload at most 50 MB
+MEDIA_MAX_UPLOAD_BYTES = int(os.getenv("MEDIA_MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+
+# Post.media_path of an object in this store
+MEDIA_REF_PREFIX = "sha256:"
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+class MediaTooLarge(Exception):
+    pass
+
+class MediaEmpty(Exception):
+    pass
+
+class MediaNotFound(Exception):
+    pass
+
+@dataclass
+class StoredMedia:
+    sha256: str
+    size: int
+    content_type: str
+    path: str
+    deduplicated: bool = False
+
+    @property
+    def media_path(self) -> str:
+        return f"{MEDIA_REF_PREFIX}{self.sha256}"
+
+def parse_media_ref(media_path: Optional[str]) -> Optional[str]:
+    """
+    The content hash when `media_path` refers to the media store, else None
+    (e.g. legacy free-form paths).
+    """
+    if not media_path or not media_path.startswith(MEDIA_REF_PREFIX):
+        return None
+    sha = media_path[len(MEDIA_REF_PREFIX):].strip().lower()
+    return sha if _SHA256_RE.match(sha) else None
+
+class MediaStore:
+    """
+    Content-addressed object store on the local filesystem. Objects live at
+    objects/<aa>/<bb>/<sha256> with a small JSON sidecar holding the content type, so the
+    same bytes are stored once however often they are uploaded. Uploads are streamed to
+    a temp file while hashed and renamed into place, so readers never see partial objects.
+    """
+
+    def __init__(self, root: str = MEDIA_ROOT, max_bytes: int = MEDIA_MAX_UPLOAD_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.stats = {"uploads": 0, "deduplicated": 0, "bytes_written": 0, "rejected": 0}
+
+    def path_for(self, sha256: str) -> str:
+        return os.path.join(self.root, "objects", sha256[:2], sha256[2:4], sha256)
+
+    def _meta_path(self, sha256: str) -> str:
+        return self.path_for(sha256) + ".json"
+
+    def exists(self, sha256: str) -> bool:
+        return os.path.exists(self.path_for(sha256))
+
+    def stat(self, sha256: str) -> StoredMedia:
+        path = self.path_for(sha256)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            raise MediaNotFound(sha256)
+        content_type = "application/octet-stream"
+        try:
+            with open(self._meta_path(sha256)) as f:
+                content_type = json.load(f).get("content_type") or content_type
+        except (OSError, ValueError):
+            pass
+        return StoredMedia(sha256=sha256, size=size, content_type=content_type, path=path)
+
+    async def put_stream(self, chunks: AsyncIterator[bytes], content_type: Optional[str] = None) -> StoredMedia:
+        """
+        Store an upload given as a stream of chunks and return its content address.
+        Raises MediaTooLarge past `max_bytes` and MediaEmpty for a zero-length stream;
+        either way nothing is kept.
+        """
+        tmp_dir = os.path.join(self.root, "tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        tmp_path = os.path.join(tmp_dir, uuid.uuid4().hex)
+        digest = hashlib.sha256()
+        size = 0
+        f = await asyncio.to_thread(open, tmp_path, "wb")
+        try:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                size += len(chunk)
+                if size > self.max_bytes:
+                    self.stats["rejected"] += 1
+                    raise MediaTooLarge(f"media larger than {self.max_bytes} bytes")
+                digest.update(chunk)
+                await asyncio.to_thread(f.write, chunk)
+            await asyncio.to_thread(f.close)
+            if size == 0:
+                self.stats["rejected"] += 1
+                raise MediaEmpty("empty upload")
+            sha = digest.hexdigest()
+            stored = await asyncio.to_thread(self._commit, tmp_path, sha, content_type or "application/octet-stream")
+        except BaseException:
+            f.close()
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        stored.size = size
+        self.stats["uploads"] += 1
+        if stored.deduplicated:
+            self.stats["deduplicated"] += 1
+        else:
+            self.stats["bytes_written"] += size
+        return stored
+
+    def _commit(self, tmp_path: str, sha256: str, content_type: str) -> StoredMedia:
+        path = self.path_for(sha256)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+            return StoredMedia(sha256=sha256, size=0, content_type=self.stat(sha256).content_type, path=path, deduplicated=True)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(self._meta_path(sha256), "w") as f:
+            json.dump({"content_type": content_type}, f)
+        os.replace(tmp_path, path)
+        return StoredMedia(sha256=sha256, size=0, content_type=content_type, path=path)
+
+    def snapshot(self) -> dict:
+        return dict(self.stats)
+
+media_store = MediaStore()
+metrics.register("media_store", media_store.snapshot)
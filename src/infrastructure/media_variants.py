@@ -0,0 +1,278 @@
+# src/infrastructure/media_variants.py
+import asyncio
+import importlib.util
+import os
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+import structlog
+
+from src.infrastructure import metrics
+from src.infrastructure.media_store import MEDIA_ROOT, MediaNotFound, MediaStore, media_store, parse_media_ref
+
+logger = structlog.get_logger(__name__)
+
+# renditions need Pillow; without it media is published as uploaded
+PILLOW_AVAILABLE = importlib.util.find_spec("PIL") is not None
+MEDIA_VARIANT_WORKERS = int(os.getenv("MEDIA_VARIANT_WORKERS", "2"))
+MEDIA_VARIANT_CACHE_DIR = os.getenv("MEDIA_VARIANT_CACHE_DIR", os.path.join(MEDIA_ROOT, "variants"))
+MEDIA_VARIANT_CACHE_BYTES = int(os.getenv("MEDIA_VARIANT_CACHE_BYTES", str(2 * 1024 * 1024 * 1024)))
+
+@dataclass(frozen=True)
+class VariantSpec:
+    name: str
+    max_width: int
+    max_height: int
+    format: str = "JPEG"  # JPEG, WEBP
+    quality: int = 85
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}-{self.max_width}x{self.max_height}-q{self.quality}.{self.format.lower()}"
+
+    @property
+    def content_type(self) -> str:
+        return f"image/{self.format.lower()}"
+
+TELEGRAM_PHOTO = VariantSpec("telegram_photo", 2560, 2560)
+THUMBNAIL = VariantSpec("thumb", 320, 320, quality=80)
+INSTAGRAM_FEED = VariantSpec("instagram_feed", 1080, 1350, quality=90)
+# in-app preview of scheduled media, served by GET /media/{sha256}/preview
+WEB_PREVIEW = VariantSpec("preview", 640, 640, format="WEBP", quality=80)
+
+# renditions generated ahead of publishing, per provider
+PLATFORM_VARIANTS: Dict[str, List[VariantSpec]] = {
+    "telegram": [TELEGRAM_PHOTO, THUMBNAIL, WEB_PREVIEW],
+    "instagram": [INSTAGRAM_FEED, THUMBNAIL, WEB_PREVIEW],
+}
+
+# --- executed inside the worker processes ---
+def _render_job(src_path: str, out_path: str, max_width: int, max_height: int, fmt: str, quality: int) -> int:
+    from PIL import Image, ImageOps
+
+    with Image.open(src_path) as img:
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((max_width, max_height), Image.LANCZOS)
+        if fmt == "JPEG" and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        tmp_path = f"{out_path}.{uuid.uuid4().hex}.tmp"
+        img.save(tmp_path, fmt, quality=quality, optimize=True)
+    os.replace(tmp_path, out_path)
+    return os.path.getsize(out_path)
+
+class VariantCache:
+    """
+    Renditions on disk at <root>/<sha[:2]>/<sha>/<spec key>, with LRU eviction once they
+    exceed `max_bytes`. Recency is tracked in memory and seeded from file mtimes by `load`.
+    Every filesystem call runs in a thread, never on the event loop.
+    """
+
+    def __init__(self, root: str = MEDIA_VARIANT_CACHE_DIR, max_bytes: int = MEDIA_VARIANT_CACHE_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self.total_bytes = 0
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def path_for(self, sha256: str, spec: VariantSpec) -> str:
+        return os.path.join(self.root, sha256[:2], sha256, spec.key)
+
+    def _scan(self) -> List[Tuple[str, int]]:
+        found = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                if filename.endswith(".tmp"):
+                    continue
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                found.append((st.st_mtime, path, st.st_size))
+        return [(path, size) for _, path, size in sorted(found)]
+
+    async def load(self) -> None:
+        """
+        Seed the index from the cache directory, once; called at startup, and by the first
+        lookup when there was none (e.g. standalone workers).
+        """
+        async with self._load_lock:
+            if self._loaded:
+                return
+            for path, size in await asyncio.to_thread(self._scan):
+                # renditions added while scanning are newer than anything on disk
+                if path not in self._entries:
+                    self._entries[path] = size
+                    self._entries.move_to_end(path, last=False)
+                    self.total_bytes += size
+            self._loaded = True
+
+    async def get(self, sha256: str, spec: VariantSpec) -> Optional[str]:
+        if not self._loaded:
+            await self.load()
+        path = self.path_for(sha256, spec)
+        if path in self._entries and await asyncio.to_thread(os.path.exists, path):
+            self._entries.move_to_end(path)
+            self.stats["hits"] += 1
+            return path
+        self.stats["misses"] += 1
+        return None
+
+    async def add(self, path: str, size: int) -> None:
+        if not self._loaded:
+            await self.load()
+        self.total_bytes += size - self._entries.pop(path, 0)
+        self._entries[path] = size
+        evicted = []
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            old_path, old_size = self._entries.popitem(last=False)
+            self.total_bytes -= old_size
+            self.stats["evictions"] += 1
+            evicted.append(old_path)
+        await asyncio.to_thread(self._touch_and_remove, path, evicted)
+
+    @staticmethod
+    def _touch_and_remove(path: str, evicted: List[str]) -> None:
+        # mtime carries recency across restarts
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        for old_path in evicted:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "entries": len(self._entries), "bytes": self.total_bytes, "max_bytes": self.max_bytes}
+
+class MediaVariantPipeline:
+    """
+    Derives platform-specific renditions of store images in a process pool, so resizing
+    never runs on the event loop. Each (content hash, spec) is rendered once: the result
+    is cached on disk and concurrent requests for the same rendition share one job.
+    """
+
+    def __init__(self, store: MediaStore = media_store, cache: Optional[VariantCache] = None, workers: int = MEDIA_VARIANT_WORKERS):
+        self.store = store
+        self.cache = cache or VariantCache()
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._rendering: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._background: Set[asyncio.Task] = set()
+        self.stats = {"rendered": 0, "failed": 0, "render_ms_total": 0.0, "skipped": 0}
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def start(self) -> None:
+        await self.cache.load()
+
+    async def cached_path(self, sha256: str, spec: VariantSpec) -> Optional[str]:
+        return await self.cache.get(sha256, spec)
+
+    async def get(self, sha256: str, spec: VariantSpec) -> Optional[str]:
+        """
+        Path of the rendition, rendering it if needed. None when the object is not an image
+        or Pillow is not installed.
+        """
+        path = await self.cache.get(sha256, spec)
+        if path:
+            return path
+        if not PILLOW_AVAILABLE:
+            self.stats["skipped"] += 1
+            return None
+        stored = await asyncio.to_thread(self.store.stat, sha256)
+        if not stored.content_type.startswith("image/"):
+            self.stats["skipped"] += 1
+            return None
+        key = (sha256, spec.key)
+        pending = self._rendering.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        fut = asyncio.get_running_loop().create_future()
+        self._rendering[key] = fut
+        try:
+            path = await self._render(stored.path, sha256, spec)
+            fut.set_result(path)
+            return path
+        except BaseException as e:
+            fut.set_exception(e)
+            # retrieved here so an unawaited shared future does not log "never retrieved"
+            fut.exception()
+            raise
+        finally:
+            self._rendering.pop(key, None)
+
+    async def _render(self, src_path: str, sha256: str, spec: VariantSpec) -> str:
+        out_path = self.cache.path_for(sha256, spec)
+        await asyncio.to_thread(os.makedirs, os.path.dirname(out_path), exist_ok=True)
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        try:
+            size = await loop.run_in_executor(self._pool(), _render_job, src_path, out_path, spec.max_width, spec.max_height, spec.format, spec.quality)
+        except Exception:
+            self.stats["failed"] += 1
+            raise
+        await self.cache.add(out_path, size)
+        self.stats["rendered"] += 1
+        self.stats["render_ms_total"] += (time.monotonic() - started) * 1000
+        return out_path
+
+    async def ensure_for_platform(self, sha256: str, provider: str) -> Dict[str, Optional[str]]:
+        specs = PLATFORM_VARIANTS.get(provider, [])
+        paths = await asyncio.gather(*(self.get(sha256, spec) for spec in specs))
+        return {spec.name: path for spec, path in zip(specs, paths)}
+
+    def prefetch(self, media_path: Optional[str], provider: str) -> None:
+        """
+        Render the provider's renditions of `media_path` in the background (fire and forget),
+        so they are ready before the post is published.
+        """
+        refs = [parse_media_ref(part) for part in media_path.split(",")] if media_path else []
+        refs = [ref for ref in refs if ref]
+        if not refs or provider not in PLATFORM_VARIANTS or not PILLOW_AVAILABLE:
+            return
+        for sha in refs:
+            task = asyncio.create_task(self._prefetch_one(sha, provider))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+
+    async def _prefetch_one(self, sha256: str, provider: str) -> None:
+        try:
+            await self.ensure_for_platform(sha256, provider)
+        except MediaNotFound:
+            logger.warning("media_variant_source_missing", sha256=sha256)
+        except Exception as e:
+            logger.warning("media_variant_prefetch_failed", sha256=sha256, provider=provider, error=str(e))
+
+    async def shutdown(self) -> None:
+        for task in list(self._background):
+            task.cancel()
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def snapshot(self) -> dict:
+        done = self.stats["rendered"]
+        return {
+            **self.stats,
+            "avg_render_ms": round(self.stats["render_ms_total"] / done, 2) if done else 0.0,
+            "in_progress": len(self._rendering),
+            "pillow": PILLOW_AVAILABLE,
+            "cache": self.cache.snapshot(),
+        }
+
+media_variants = MediaVariantPipeline()
+metrics.register("media_variants", media_variants.snapshot)
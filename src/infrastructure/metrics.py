@@ -0,0 +1,25 @@
+# src/infrastructure/metrics.py
+from typing import Callable, Dict
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+_providers: Dict[str, Callable[[], dict]] = {}
+
+def register(name: str, provider: Callable[[], dict]) -> None:
+    """
+    Register a callable returning a dict of counters for a subsystem.
+    Registering the same name twice replaces the previous provider.
+    """
+    _providers[name] = provider
+
+def snapshot() -> Dict[str, dict]:
+    out = {}
+    for name, provider in _providers.items():
+        try:
+            out[name] = provider()
+        except Exception as e:
+            logger.exception("metrics_provider_failed", provider=name, error=str(e))
+            out[name] = {"error": str(e)}
+    return out
@@ -0,0 +1,105 @@
+# src/infrastructure/multipart.py
+import asyncio
+import os
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Tuple
+
+# (filename, path on disk, content type)
+FilePart = Tuple[str, str, str]
+
+def _quote(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\r", " ").replace("\n", " ")
+
+class MultipartFileBody:
+    """
+    multipart/form-data body that streams its files from disk in `chunk_size` reads, so
+    memory per upload is one chunk whatever the file size. The exact length is known up
+    front (sent as Content-Length), and the body can be iterated again when a request is
+    retried.
+    """
+
+    def __init__(self, fields: Dict[str, str], files: Dict[str, FilePart], chunk_size: int = 256 * 1024):
+        self.boundary = uuid.uuid4().hex
+        self.chunk_size = chunk_size
+        self._parts: List[Tuple[bytes, str]] = []  # (part header, file path or "")
+        head = b""
+        for name, value in fields.items():
+            head += (
+                f'--{self.boundary}\r\nContent-Disposition: form-data; name="{_quote(name)}"\r\n\r\n'.encode()
+                + value.encode()
+                + b"\r\n"
+            )
+        for name, (filename, path, content_type) in files.items():
+            header = (
+                f'--{self.boundary}\r\nContent-Disposition: form-data; name="{_quote(name)}"; filename="{_quote(filename)}"\r\n'
+                f"Content-Type: {content_type}\r\n\r\n"
+            ).encode()
+            self._parts.append((head + header, path))
+            head = b"\r\n"
+        self._tail = head + f"--{self.boundary}--\r\n".encode()
+        self.content_length = len(self._tail) + sum(len(h) + os.path.getsize(p) for h, p in self._parts)
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Content-Type": self.content_type, "Content-Length": str(self.content_length)}
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for header, path in self._parts:
+            yield header
+            f = await asyncio.to_thread(open, path, "rb")
+            try:
+                while True:
+                    chunk = await asyncio.to_thread(f.read, self.chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+            finally:
+                f.close()
+        yield self._tail
+
+class ByteBudget:
+    """
+    Caps the bytes of concurrent uploads in this worker. `reserve(n)` waits until `n` more
+    bytes fit under `limit`; a single upload larger than the limit runs alone.
+    Waiters are served in arrival order, so large uploads are not starved by small ones.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self._cond = asyncio.Condition()
+        self._queue: List[object] = []
+        self.stats = {"reservations": 0, "waited": 0, "max_in_flight": 0}
+
+    def _fits(self, ticket: object, n: int) -> bool:
+        return self._queue[0] is ticket and (self.in_flight + n <= self.limit or self.in_flight == 0)
+
+    @asynccontextmanager
+    async def reserve(self, n: int):
+        ticket = object()
+        async with self._cond:
+            self._queue.append(ticket)
+            if not self._fits(ticket, n):
+                self.stats["waited"] += 1
+            try:
+                await self._cond.wait_for(lambda: self._fits(ticket, n))
+            finally:
+                self._queue.remove(ticket)
+                self._cond.notify_all()
+            self.in_flight += n
+            self.stats["reservations"] += 1
+            self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.in_flight)
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self.in_flight -= n
+                self._cond.notify_all()
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "in_flight": self.in_flight, "limit": self.limit, "waiting": len(self._queue)}
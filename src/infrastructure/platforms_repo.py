@@ -1,8 +1,11 @@
 # src/infrastructure/platforms_repo.py
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import bindparam, delete, update
 from sqlmodel import select
 from src.models.connected_platform import ConnectedPlatform
+from src.infrastructure.database import after_commit, commit_or_flush, update_returning
+from src.infrastructure.cache import EntityCache, entity_cache, from_snapshot, to_snapshot
 import uuid
 from datetime import datetime
 
@@ -17,11 +20,10 @@ class PlatformsRepository:
 
     async def create(self, cp: ConnectedPlatform) -> ConnectedPlatform:
         """
-        Persist a new ConnectedPlatform and return refreshed instance.
+        Persist a new ConnectedPlatform and return it (id and defaults are generated client-side).
         """
         self.session.add(cp)
-        await self.session.commit()
-        await self.session.refresh(cp)
+        await commit_or_flush(self.session)
         return cp
 
     async def get_by_id(self, id: uuid.UUID) -> Optional[ConnectedPlatform]:
@@ -60,37 +62,189 @@ class PlatformsRepository:
     ) -> ConnectedPlatform:
         """
         Update token fields and optionally meta, token_expires_at and updated_at.
-        Commits and returns refreshed instance.
+        One UPDATE ... RETURNING; commits (or flushes inside a unit of work) and returns the updated row.
         """
-        cp.access_token_enc = access_token_enc
-        cp.refresh_token_enc = refresh_token_enc
-        cp.token_expires_at = expires_at
+        values = {
+            "access_token_enc": access_token_enc,
+            "refresh_token_enc": refresh_token_enc,
+            "token_expires_at": expires_at,
+            "updated_at": datetime.utcnow(),
+        }
         if meta is not None:
             # merge meta shallowly (caller can decide full replace or merge)
-            cp.meta = meta
-        cp.updated_at = datetime.utcnow()
-        self.session.add(cp)
-        await self.session.commit()
-        await self.session.refresh(cp)
-        return cp
+            values["meta"] = meta
+        updated = await update_returning(self.session, ConnectedPlatform, cp.id, values)
+        return updated or cp
+
+    async def update_tokens_many(
+        self,
+        updates: List[Tuple[ConnectedPlatform, str, Optional[str], Optional[datetime]]],
+    ) -> List[uuid.UUID]:
+        """
+        Batched `update_tokens`: (cp, access_token_enc, refresh_token_enc, expires_at) per row,
+        written with one executemany UPDATE by primary key. A row is only written if its
+        updated_at still matches `cp`, so a token another worker refreshed (or the user
+        reconnected) in the meantime is never overwritten with an older one.
+        Returns the ids of the rows actually written.
+        """
+        if not updates:
+            return []
+        now = datetime.utcnow()
+        table = ConnectedPlatform.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("_id"), table.c.updated_at == bindparam("_updated_at"))
+            .values(
+                access_token_enc=bindparam("_access"),
+                refresh_token_enc=bindparam("_refresh"),
+                token_expires_at=bindparam("_expires_at"),
+                updated_at=now,
+            )
+        )
+        rows = [
+            {"_id": cp.id, "_updated_at": cp.updated_at, "_access": access, "_refresh": refresh, "_expires_at": expires_at}
+            for cp, access, refresh, expires_at in updates
+        ]
+        await self.session.execute(stmt, rows)
+        # executemany has no per-row rowcount on every driver: the rows written are the ones
+        # now carrying this batch's updated_at (read inside the same transaction)
+        q = select(ConnectedPlatform.id).where(
+            ConnectedPlatform.id.in_([cp.id for cp, *_ in updates]),
+            ConnectedPlatform.updated_at == now,
+        )
+        written = list((await self.session.execute(q)).scalars().all())
+        await commit_or_flush(self.session)
+        return written
+
+    async def reencrypt_tokens_many(self, updates: List[Tuple[ConnectedPlatform, str, Optional[str]]]) -> None:
+        """
+        Store re-encrypted (same plaintext, newer key) tokens: (cp, access_token_enc, refresh_token_enc).
+        A row is only written if its updated_at still matches, so tokens refreshed in the
+        meantime are never overwritten; updated_at itself is left alone.
+        """
+        if not updates:
+            return
+        table = ConnectedPlatform.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("_id"), table.c.updated_at == bindparam("_updated_at"))
+            .values(access_token_enc=bindparam("_access"), refresh_token_enc=bindparam("_refresh"))
+        )
+        rows = [
+            {"_id": cp.id, "_updated_at": cp.updated_at, "_access": access, "_refresh": refresh}
+            for cp, access, refresh in updates
+        ]
+        await self.session.execute(stmt, rows)
+        await commit_or_flush(self.session)
 
     async def update_provider_user_id(self, cp: ConnectedPlatform, provider_user_id: str) -> ConnectedPlatform:
-        cp.provider_user_id = provider_user_id
-        cp.updated_at = datetime.utcnow()
-        self.session.add(cp)
-        await self.session.commit()
-        await self.session.refresh(cp)
-        return cp
+        values = {"provider_user_id": provider_user_id, "updated_at": datetime.utcnow()}
+        updated = await update_returning(self.session, ConnectedPlatform, cp.id, values)
+        return updated or cp
 
     async def delete(self, cp: ConnectedPlatform) -> None:
         """
         Delete the provided ConnectedPlatform instance.
         """
-        await self.session.delete(cp)
-        await self.session.commit()
+        await self._delete_row(cp.id)
+
+    async def delete_by_id(self, id: uuid.UUID) -> None:
+        await self._delete_row(id)
+
+    async def _delete_row(self, id: uuid.UUID) -> None:
+        # plain DELETE by primary key: no SELECT first, and works for detached instances
+        stmt = delete(ConnectedPlatform).where(ConnectedPlatform.id == id).execution_options(synchronize_session=False)
+        await self.session.execute(stmt)
+        await commit_or_flush(self.session)
+
+class CachedPlatformsRepository(PlatformsRepository):
+    """
+    PlatformsRepository with read-through caching of the hot lookups used by the
+    publishing and OAuth flows. Every write invalidates the affected keys locally
+    and broadcasts the invalidation to the other workers.
+    """
+
+    def __init__(self, session: AsyncSession, cache: Optional[EntityCache] = None):
+        super().__init__(session)
+        self.cache = cache or entity_cache
+
+    @staticmethod
+    def _keys(cp: ConnectedPlatform) -> List[str]:
+        return [f"cp:{cp.id}", f"cp:user:{cp.user_id}:{cp.provider}", f"cp:list:{cp.user_id}"]
+
+    async def _invalidate(self, keys: List[str]) -> None:
+        # deferred to the commit inside a unit of work, so no worker re-caches the old row
+        await after_commit(self.session, lambda: self.cache.invalidate(keys))
+
+    async def get_by_id(self, id: uuid.UUID) -> Optional[ConnectedPlatform]:
+        key = f"cp:{id}"
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return from_snapshot(ConnectedPlatform, cached)
+        cp = await super().get_by_id(id)
+        if cp:
+            await self.cache.set(key, to_snapshot(cp))
+        return cp
+
+    async def get_by_user_and_provider(self, user_id: str, provider: str) -> Optional[ConnectedPlatform]:
+        key = f"cp:user:{user_id}:{provider}"
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return from_snapshot(ConnectedPlatform, cached)
+        cp = await super().get_by_user_and_provider(user_id, provider)
+        if cp:
+            await self.cache.set(key, to_snapshot(cp))
+        return cp
+
+    async def list_by_user(self, user_id: str) -> List[ConnectedPlatform]:
+        key = f"cp:list:{user_id}"
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return [from_snapshot(ConnectedPlatform, item) for item in cached]
+        items = await super().list_by_user(user_id)
+        await self.cache.set(key, [to_snapshot(cp) for cp in items])
+        return items
+
+    async def create(self, cp: ConnectedPlatform) -> ConnectedPlatform:
+        created = await super().create(cp)
+        await self._invalidate(self._keys(created))
+        return created
+
+    async def update_tokens(
+        self,
+        cp: ConnectedPlatform,
+        access_token_enc: str,
+        refresh_token_enc: Optional[str],
+        expires_at: Optional[datetime],
+        meta: Optional[dict] = None
+    ) -> ConnectedPlatform:
+        updated = await super().update_tokens(cp, access_token_enc, refresh_token_enc, expires_at, meta)
+        await self._invalidate(self._keys(updated))
+        return updated
+
+    async def update_tokens_many(
+        self,
+        updates: List[Tuple[ConnectedPlatform, str, Optional[str], Optional[datetime]]],
+    ) -> List[uuid.UUID]:
+        written = await super().update_tokens_many(updates)
+        await self._invalidate(list(dict.fromkeys(key for cp, *_ in updates for key in self._keys(cp))))
+        return written
+
+    async def reencrypt_tokens_many(self, updates: List[Tuple[ConnectedPlatform, str, Optional[str]]]) -> None:
+        await super().reencrypt_tokens_many(updates)
+        await self._invalidate(list(dict.fromkeys(key for cp, *_ in updates for key in self._keys(cp))))
+
+    async def update_provider_user_id(self, cp: ConnectedPlatform, provider_user_id: str) -> ConnectedPlatform:
+        updated = await super().update_provider_user_id(cp, provider_user_id)
+        await self._invalidate(self._keys(updated))
+        return updated
+
+    async def delete(self, cp: ConnectedPlatform) -> None:
+        keys = self._keys(cp)
+        await super().delete(cp)
+        await self._invalidate(keys)
 
     async def delete_by_id(self, id: uuid.UUID) -> None:
-        cp = await self.get_by_id(id)
+        cp = await PlatformsRepository.get_by_id(self, id)
         if cp:
-            await self.session.delete(cp)
-            await self.session.commit()
+            await self.delete(cp)
@@ -1,54 +1,357 @@
+import asyncio
+import json
 import os
-from typing import Optional
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
 
 import httpx
+import structlog
+
+from src.infrastructure import metrics
+from src.infrastructure.http_clients import http_clients
+from src.infrastructure.multipart import ByteBudget, MultipartFileBody
+from src.infrastructure.media_store import MediaStore, StoredMedia, media_store, parse_media_ref
+from src.infrastructure.media_variants import TELEGRAM_PHOTO, media_variants
+from src.infrastructure.redis_cache import redis_client
+
+logger = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+
+# Telegram's documented limits: ~30 messages/second per bot, 1 message/second
+# per private chat and 20 messages/minute per group or channel.
+TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", "30"))
+TELEGRAM_CHAT_RATE = float(os.getenv("TELEGRAM_CHAT_RATE", "1"))
+TELEGRAM_GROUP_RATE_PER_MINUTE = float(os.getenv("TELEGRAM_GROUP_RATE_PER_MINUTE", "20"))
+TELEGRAM_MAX_429_RETRIES = int(os.getenv("TELEGRAM_MAX_429_RETRIES", "5"))
+TELEGRAM_MAX_TRACKED_CHATS = 10000
+# file_ids stay valid for as long as the file exists on Telegram's side; expire them anyway
+TELEGRAM_FILE_ID_TTL_SECONDS = int(os.getenv("TELEGRAM_FILE_ID_TTL_SECONDS", str(90 * 24 * 3600)))
+TELEGRAM_CAPTION_LIMIT = 1024
+TELEGRAM_MEDIA_GROUP_MAX = 10
+TELEGRAM_FANOUT_CONCURRENCY = int(os.getenv("TELEGRAM_FANOUT_CONCURRENCY", "10"))
+# total bytes of media uploads in flight per worker; further uploads wait (backpressure)
+TELEGRAM_UPLOAD_BUDGET_BYTES = int(os.getenv("TELEGRAM_UPLOAD_BUDGET_BYTES", str(200 * 1024 * 1024)))
+TELEGRAM_UPLOAD_CHUNK_BYTES = int(os.getenv("TELEGRAM_UPLOAD_CHUNK_BYTES", str(256 * 1024)))
+TELEGRAM_UPLOAD_TIMEOUT = float(os.getenv("TELEGRAM_UPLOAD_TIMEOUT", "300"))
 
 
 class TelegramBotError(Exception):
     pass
 
 
+class TelegramRateLimitError(TelegramBotError):
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Reservation-based token bucket: `reserve` always takes a token and returns how long
+    the caller must wait before using it, so waiters are served in arrival order.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    @property
+    def idle(self) -> bool:
+        return self.tokens + (time.monotonic() - self.updated) * self.rate >= self.capacity
+
+
+class TelegramSendQueue:
+    """
+    Paces sends for one bot: a global bucket for the bot plus one bucket per chat.
+    Sends to the same chat are serialized; a 429 pauses that chat for exactly
+    `retry_after` seconds and the send is retried instead of failing the caller.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = TELEGRAM_GLOBAL_RATE,
+        chat_rate: float = TELEGRAM_CHAT_RATE,
+        group_rate_per_minute: float = TELEGRAM_GROUP_RATE_PER_MINUTE,
+        max_retries: int = TELEGRAM_MAX_429_RETRIES,
+    ):
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate_per_minute / 60.0
+        self.max_retries = max_retries
+        self._global = TokenBucket(global_rate, global_rate)
+        self._chats: Dict[str, TokenBucket] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._paused_until: Dict[str, float] = {}
+        self.depth = 0
+        self.stats = {"sent": 0, "throttled": 0, "rate_limited": 0, "wait_seconds_total": 0.0, "max_wait_seconds": 0.0}
+
+    def snapshot(self) -> dict:
+        sent = self.stats["sent"]
+        return {
+            **self.stats,
+            "queue_depth": self.depth,
+            "paused_chats": sum(1 for until in self._paused_until.values() if until > time.monotonic()),
+            "avg_wait_seconds": round(self.stats["wait_seconds_total"] / sent, 4) if sent else 0.0,
+        }
+
+    def _chat_bucket(self, chat_id: str) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            # negative ids and @usernames are groups/channels with the stricter per-minute limit
+            rate = self.group_rate if chat_id.startswith(("-", "@")) else self.chat_rate
+            bucket = self._chats[chat_id] = TokenBucket(rate, 1)
+        return bucket
+
+    def _prune(self) -> None:
+        if len(self._chats) < TELEGRAM_MAX_TRACKED_CHATS:
+            return
+        now = time.monotonic()
+        for chat_id in list(self._chats):
+            lock = self._locks.get(chat_id)
+            if self._chats[chat_id].idle and not (lock and lock.locked()) and self._paused_until.get(chat_id, 0) <= now:
+                self._chats.pop(chat_id, None)
+                self._locks.pop(chat_id, None)
+                self._paused_until.pop(chat_id, None)
+
+    async def _wait_turn(self, chat_id: str) -> float:
+        waited = 0.0
+        pause = self._paused_until.get(chat_id, 0) - time.monotonic()
+        if pause > 0:
+            await asyncio.sleep(pause)
+            waited += pause
+        for bucket in (self._chat_bucket(chat_id), self._global):
+            delay = bucket.reserve()
+            if delay > 0:
+                self.stats["throttled"] += 1
+                await asyncio.sleep(delay)
+                waited += delay
+        return waited
+
+    async def submit(self, chat_id: str, send: Callable[[], Awaitable[T]]) -> T:
+        chat_id = str(chat_id)
+        self._prune()
+        self.depth += 1
+        started = time.monotonic()
+        try:
+            lock = self._locks.setdefault(chat_id, asyncio.Lock())
+            async with lock:
+                attempt = 0
+                while True:
+                    await self._wait_turn(chat_id)
+                    try:
+                        result = await send()
+                        break
+                    except TelegramRateLimitError as e:
+                        self.stats["rate_limited"] += 1
+                        self._paused_until[chat_id] = time.monotonic() + e.retry_after
+                        attempt += 1
+                        logger.warning("telegram_rate_limited", chat_id=chat_id, retry_after=e.retry_after, attempt=attempt)
+                        if attempt > self.max_retries:
+                            raise
+            self.stats["sent"] += 1
+            return result
+        finally:
+            self.depth -= 1
+            waited = time.monotonic() - started
+            self.stats["wait_seconds_total"] += waited
+            self.stats["max_wait_seconds"] = max(self.stats["max_wait_seconds"], waited)
+
+
+_send_queues: Dict[str, TelegramSendQueue] = {}
+
+
+def get_send_queue(bot_token: str) -> TelegramSendQueue:
+    """
+    One queue per bot token, shared by every TelegramBotClient in this worker.
+    """
+    queue = _send_queues.get(bot_token)
+    if queue is None:
+        queue = _send_queues[bot_token] = TelegramSendQueue()
+    return queue
+
+
+def _send_queue_metrics() -> dict:
+    # keyed by the bot id (the part of the token before ':'), never the secret
+    return {token.split(":", 1)[0]: queue.snapshot() for token, queue in _send_queues.items()}
+
+
+metrics.register("telegram_send_queues", _send_queue_metrics)
+
+
+class TelegramFileIdCache:
+    """
+    Telegram `file_id`s of media already uploaded, per bot and content hash
+    (`tg:fid:{bot_id}:{sha256}`), so an asset is uploaded once and afterwards sent by id.
+    Redis errors only cost a re-upload.
+    """
+
+    def __init__(self, redis, ttl: int = TELEGRAM_FILE_ID_TTL_SECONDS):
+        self.redis = redis
+        self.ttl = ttl
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "stale": 0}
+
+    @staticmethod
+    def _key(bot_id: str, sha256: str) -> str:
+        return f"tg:fid:{bot_id}:{sha256}"
+
+    async def get(self, bot_id: str, sha256: str) -> Optional[str]:
+        try:
+            file_id = await self.redis.get(self._key(bot_id, sha256))
+        except Exception as e:
+            logger.warning("telegram_file_id_cache_error", error=str(e))
+            file_id = None
+        self.stats["hits" if file_id else "misses"] += 1
+        return file_id
+
+    async def set(self, bot_id: str, sha256: str, file_id: str) -> None:
+        try:
+            await self.redis.set(self._key(bot_id, sha256), file_id, ex=self.ttl)
+            self.stats["stored"] += 1
+        except Exception as e:
+            logger.warning("telegram_file_id_cache_error", error=str(e))
+
+    async def forget(self, bot_id: str, sha256: str) -> None:
+        self.stats["stale"] += 1
+        try:
+            await self.redis.delete(self._key(bot_id, sha256))
+        except Exception as e:
+            logger.warning("telegram_file_id_cache_error", error=str(e))
+
+    def snapshot(self) -> dict:
+        return dict(self.stats)
+
+
+file_id_cache = TelegramFileIdCache(redis_client)
+metrics.register("telegram_file_ids", file_id_cache.snapshot)
+
+upload_budget = ByteBudget(TELEGRAM_UPLOAD_BUDGET_BYTES)
+metrics.register("telegram_uploads", upload_budget.snapshot)
+
+# media kind -> (Bot API method, multipart field)
+MEDIA_METHODS = {
+    "photo": ("sendPhoto", "photo"),
+    "video": ("sendVideo", "video"),
+    "document": ("sendDocument", "document"),
+}
+
+
+def media_kind(content_type: str) -> str:
+    if content_type.startswith("image/") and content_type != "image/gif":
+        return "photo"
+    if content_type.startswith("video/"):
+        return "video"
+    return "document"
+
+
+@dataclass
+class RenderedPost:
+    text: str
+    media: List[str]  # media store content hashes
+    caption: Optional[str]
+
+
+def render_post(title: Optional[str], content: Optional[str], media_path: Optional[str]) -> RenderedPost:
+    """
+    Build the message for a post once, to send to any number of chats. When `media_path`
+    refers to the media store (one `sha256:` ref, or up to 10 comma-separated for an album)
+    the media itself is sent with the text as caption (or followed by the text when it is
+    too long for a caption); other media paths are only mentioned in the text.
+    """
+    refs = [parse_media_ref(part) for part in media_path.split(",")] if media_path else []
+    media = refs if refs and all(refs) else []
+    message_parts = []
+    if title:
+        message_parts.append(f"<b>{title}</b>")
+    if content:
+        message_parts.append(content)
+    if media_path and not media:
+        message_parts.append(f"Media: {media_path}")
+    text = "\n\n".join(message_parts).strip()
+    if not text and not media:
+        raise TelegramBotError("Post content is empty; nothing to publish to Telegram")
+    caption = text if media and len(text) <= TELEGRAM_CAPTION_LIMIT else None
+    return RenderedPost(text=text, media=media, caption=caption)
+
+
+def _file_id(message: dict, kind: str) -> Optional[str]:
+    if kind == "photo":
+        sizes = message.get("photo") or []
+        # all sizes share one upload; the largest one re-sends the original quality
+        return sizes[-1]["file_id"] if sizes else None
+    return (message.get(kind) or {}).get("file_id")
+
+
 class TelegramBotClient:
     def __init__(
         self,
         bot_token: Optional[str] = None,
         chat_id: Optional[str] = None,
         timeout: int = 30,
+        http_client: Optional[httpx.AsyncClient] = None,
     ):
         self.bot_token = bot_token or os.getenv("TELEGRAM_BOT_TOKEN")
         self.chat_id = chat_id or os.getenv("TELEGRAM_CHAT_ID")
         self.timeout = timeout
+        # shared keep-alive client; connections are reused across messages
+        self.http_client = http_client or http_clients.get("telegram")
 
         if not self.bot_token:
             raise TelegramBotError("TELEGRAM_BOT_TOKEN is not configured")
 
-        if not self.chat_id:
-            raise TelegramBotError("TELEGRAM_CHAT_ID is not configured")
-
         self.base_url = f"https://api.telegram.org/bot{self.bot_token}"
+        self.bot_id = self.bot_token.split(":", 1)[0]
+        self.send_queue = get_send_queue(self.bot_token)
+        self.media_store: MediaStore = media_store
+        self.file_ids = file_id_cache
 
-    async def publish_post(self, title: Optional[str], content: Optional[str], media_path: Optional[str]) -> dict:
-        message_parts = []
-        if title:
-            message_parts.append(f"<b>{title}</b>")
-        if content:
-            message_parts.append(content)
-        if media_path:
-            message_parts.append(f"Media: {media_path}")
+    def _chat(self, chat_id: Optional[str]) -> str:
+        # per-call chat (fan-out, connected platforms) or the default TELEGRAM_CHAT_ID
+        chat = chat_id or self.chat_id
+        if not chat:
+            raise TelegramBotError("no chat id given and TELEGRAM_CHAT_ID is not configured")
+        return str(chat)
 
-        text = "\n\n".join(message_parts).strip()
-        if not text:
-            raise TelegramBotError("Post content is empty; nothing to publish to Telegram")
+    async def _call(self, method: str, payload: dict) -> dict:
+        response = await self.http_client.post(f"{self.base_url}/{method}", json=payload, timeout=self.timeout)
+        return self._parse_response(response)
 
-        payload = {
-            "chat_id": self.chat_id,
-            "text": text,
-            "parse_mode": "HTML",
-            "disable_web_page_preview": False,
-        }
+    async def _call_multipart(self, method: str, payload: dict, uploads: Dict[str, StoredMedia]) -> dict:
+        """
+        POST `payload` as form fields plus the given store objects as file parts. Files are
+        streamed from disk in TELEGRAM_UPLOAD_CHUNK_BYTES reads, never loaded whole, and
+        the upload waits for room in the per-worker upload budget first.
+        A retried send builds a fresh body and re-reads the files from the start.
+        """
+        fields = {k: (json.dumps(v) if isinstance(v, (dict, list)) else str(v)) for k, v in payload.items() if v is not None}
+        files = {field: (stored.sha256[:16], stored.path, stored.content_type) for field, stored in uploads.items()}
+        body = MultipartFileBody(fields, files, chunk_size=TELEGRAM_UPLOAD_CHUNK_BYTES)
+        async with upload_budget.reserve(body.content_length):
+            response = await self.http_client.post(
+                f"{self.base_url}/{method}",
+                content=body,
+                headers=body.headers,
+                timeout=httpx.Timeout(self.timeout, write=TELEGRAM_UPLOAD_TIMEOUT),
+            )
+        return self._parse_response(response)
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.post(f"{self.base_url}/sendMessage", json=payload)
+    @staticmethod
+    def _parse_response(response: httpx.Response) -> dict:
+        if response.status_code == 429:
+            try:
+                retry_after = float(response.json().get("parameters", {}).get("retry_after", 1))
+            except ValueError:
+                retry_after = 1.0
+            raise TelegramRateLimitError(f"Telegram API rate limited: {response.text}", retry_after=retry_after)
 
         if response.status_code >= 400:
             raise TelegramBotError(f"Telegram API error ({response.status_code}): {response.text}")
@@ -58,3 +361,171 @@ class TelegramBotClient:
             raise TelegramBotError(f"Telegram API rejected message: {body}")
 
         return body
+
+    async def send_message(self, text: str, chat_id: Optional[str] = None) -> dict:
+        chat = self._chat(chat_id)
+        payload = {
+            "chat_id": chat,
+            "text": text,
+            "parse_mode": "HTML",
+            "disable_web_page_preview": False,
+        }
+        return await self.send_queue.submit(chat, lambda: self._call("sendMessage", payload))
+
+    async def get_chat(self, chat_id: str) -> dict:
+        """
+        Chat info; fails unless this bot can see the chat (e.g. is a channel admin).
+        """
+        body = await self._call("getChat", {"chat_id": chat_id})
+        return body.get("result") or {}
+
+    async def send_media(self, sha256: str, kind: Optional[str] = None, chat_id: Optional[str] = None, caption: Optional[str] = None) -> dict:
+        """
+        Send one object from the media store as a photo, video or document (by default
+        chosen from its content type). The first send uploads it; later sends of the same
+        content by this bot only pass the cached file_id.
+        """
+        stored = self.media_store.stat(sha256)
+        kind = kind or media_kind(stored.content_type)
+        method, field = MEDIA_METHODS[kind]
+        chat = self._chat(chat_id)
+        payload = {"chat_id": chat}
+        if caption:
+            payload.update(caption=caption, parse_mode="HTML")
+
+        file_id = await self.file_ids.get(self.bot_id, sha256)
+        if file_id:
+            try:
+                return await self.send_queue.submit(chat, lambda: self._call(method, {**payload, field: file_id}))
+            except TelegramRateLimitError:
+                raise
+            except TelegramBotError as e:
+                if "file" not in str(e).lower():
+                    raise
+                # the id is no longer accepted: upload again
+                await self.file_ids.forget(self.bot_id, sha256)
+
+        if kind == "photo":
+            stored = await self._photo_rendition(stored)
+        body = await self.send_queue.submit(chat, lambda: self._call_multipart(method, payload, {field: stored}))
+        new_id = _file_id(body.get("result") or {}, kind)
+        if new_id:
+            await self.file_ids.set(self.bot_id, sha256, new_id)
+        return body
+
+    @staticmethod
+    async def _photo_rendition(stored: StoredMedia) -> StoredMedia:
+        # the pre-rendered Telegram-sized JPEG when available (usually prefetched when the
+        # post was scheduled), otherwise the original
+        try:
+            path = await media_variants.get(stored.sha256, TELEGRAM_PHOTO)
+        except Exception as e:
+            logger.warning("telegram_photo_rendition_failed", sha256=stored.sha256, error=str(e))
+            path = None
+        if not path:
+            return stored
+        return StoredMedia(sha256=stored.sha256, size=os.path.getsize(path), content_type=TELEGRAM_PHOTO.content_type, path=path)
+
+    async def send_photo(self, sha256: str, chat_id: Optional[str] = None, caption: Optional[str] = None) -> dict:
+        return await self.send_media(sha256, "photo", chat_id=chat_id, caption=caption)
+
+    async def send_video(self, sha256: str, chat_id: Optional[str] = None, caption: Optional[str] = None) -> dict:
+        return await self.send_media(sha256, "video", chat_id=chat_id, caption=caption)
+
+    async def send_document(self, sha256: str, chat_id: Optional[str] = None, caption: Optional[str] = None) -> dict:
+        return await self.send_media(sha256, "document", chat_id=chat_id, caption=caption)
+
+    async def send_media_group(self, sha256s: List[str], chat_id: Optional[str] = None, caption: Optional[str] = None) -> dict:
+        """
+        Send 2-10 store objects as one album. Items with a cached file_id are sent by id,
+        the rest are attached to the same request; new file_ids are cached afterwards.
+        """
+        if not 2 <= len(sha256s) <= TELEGRAM_MEDIA_GROUP_MAX:
+            raise TelegramBotError(f"a media group takes 2 to {TELEGRAM_MEDIA_GROUP_MAX} items")
+        chat = self._chat(chat_id)
+        items = []
+        for sha in sha256s:
+            stored = self.media_store.stat(sha)
+            items.append((sha, stored, media_kind(stored.content_type)))
+        if len({kind == "document" for _, _, kind in items}) > 1:
+            raise TelegramBotError("documents cannot be mixed with photos or videos in a media group")
+
+        cached = await asyncio.gather(*(self.file_ids.get(self.bot_id, sha) for sha, _, _ in items))
+        media, uploads = [], {}
+        for i, ((sha, stored, kind), file_id) in enumerate(zip(items, cached)):
+            entry = {"type": kind}
+            if file_id:
+                entry["media"] = file_id
+            else:
+                entry["media"] = f"attach://file{i}"
+                uploads[f"file{i}"] = await self._photo_rendition(stored) if kind == "photo" else stored
+            if i == 0 and caption:
+                entry.update(caption=caption, parse_mode="HTML")
+            media.append(entry)
+        payload = {"chat_id": chat, "media": media}
+
+        if uploads:
+            body = await self.send_queue.submit(chat, lambda: self._call_multipart("sendMediaGroup", payload, uploads))
+        else:
+            body = await self.send_queue.submit(chat, lambda: self._call("sendMediaGroup", payload))
+        for (sha, _, kind), file_id, message in zip(items, cached, body.get("result") or []):
+            new_id = _file_id(message, kind)
+            if new_id and new_id != file_id:
+                await self.file_ids.set(self.bot_id, sha, new_id)
+        return body
+
+    async def send_rendered(self, rendered: RenderedPost, chat_id: Optional[str] = None) -> dict:
+        """
+        Send a rendered post to one chat. Returns the API response of the first message sent.
+        """
+        if not rendered.media:
+            return await self.send_message(rendered.text, chat_id=chat_id)
+        if len(rendered.media) == 1:
+            body = await self.send_media(rendered.media[0], chat_id=chat_id, caption=rendered.caption)
+        else:
+            body = await self.send_media_group(rendered.media, chat_id=chat_id, caption=rendered.caption)
+            body = {**body, "result": (body.get("result") or [{}])[0]}
+        if rendered.text and rendered.caption is None:
+            await self.send_message(rendered.text, chat_id=chat_id)
+        return body
+
+    async def publish_post(self, title: Optional[str], content: Optional[str], media_path: Optional[str], chat_id: Optional[str] = None) -> dict:
+        return await self.send_rendered(render_post(title, content, media_path), chat_id=chat_id)
+
+    async def publish_to_chats(
+        self,
+        title: Optional[str],
+        content: Optional[str],
+        media_path: Optional[str],
+        chat_ids: List[str],
+        concurrency: int = TELEGRAM_FANOUT_CONCURRENCY,
+    ) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """
+        Send one post to many chats: rendered once, sent with at most `concurrency` chats in
+        flight. Returns chat id -> (message id, error); a failing chat never affects the others.
+        With media, the first chat is sent to alone so the rest reuse its cached file_ids
+        instead of uploading the same file in parallel.
+        """
+        rendered = render_post(title, content, media_path)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def send(chat_id: str) -> Tuple[Optional[str], Optional[str]]:
+            async with semaphore:
+                try:
+                    body = await self.send_rendered(rendered, chat_id=chat_id)
+                except TelegramBotError as e:
+                    return None, str(e)
+                except Exception as e:
+                    logger.exception("telegram_fanout_unexpected_error", chat_id=chat_id, error=str(e))
+                    return None, str(e) or e.__class__.__name__
+            message_id = (body.get("result") or {}).get("message_id")
+            return (str(message_id) if message_id is not None else None), None
+
+        targets = [str(c) for c in dict.fromkeys(chat_ids)]
+        results: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        if rendered.media and targets:
+            results[targets[0]] = await send(targets[0])
+            targets = targets[1:]
+        for chat_id, outcome in zip(targets, await asyncio.gather(*(send(c) for c in targets))):
+            results[chat_id] = outcome
+        return results
@@ -0,0 +1,60 @@
+# src/infrastructure/worker.py
+import asyncio
+from typing import Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+class PollingWorker:
+    """
+    Base class for background loops that process work in batches.
+    Subclasses implement `run_once`, returning how many items they handled; the loop
+    goes again immediately after a full batch and otherwise sleeps `poll_interval`.
+    Runs as a task inside the app (`start`/`stop`) or directly via `run_forever`.
+    """
+
+    name = "worker"
+
+    def __init__(self, batch_size: int, poll_interval: float):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def run_once(self) -> int:
+        raise NotImplementedError
+
+    async def run_forever(self) -> None:
+        logger.info(f"{self.name}_started", batch_size=self.batch_size, poll_interval=self.poll_interval)
+        while not self._stop.is_set():
+            try:
+                handled = await self.run_once()
+            except Exception as e:
+                logger.exception(f"{self.name}_batch_failed", error=str(e))
+                handled = 0
+            # a full batch means more work is probably waiting: go again without sleeping
+            if handled < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        logger.info(f"{self.name}_stopped")
+
+    def request_stop(self) -> None:
+        self._stop.set()
+
+    def start(self) -> None:
+        if not self.running:
+            self._stop.clear()
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
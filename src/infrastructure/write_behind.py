@@ -0,0 +1,90 @@
+# src/infrastructure/write_behind.py
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import structlog
+from sqlalchemy import bindparam, or_, update
+
+from src.infrastructure.database import get_session
+from src.infrastructure.worker import PollingWorker
+
+logger = structlog.get_logger(__name__)
+
+WRITE_BEHIND_FLUSH_SECONDS = float(os.getenv("WRITE_BEHIND_FLUSH_SECONDS", "10"))
+WRITE_BEHIND_MAX_ENTRIES = int(os.getenv("WRITE_BEHIND_MAX_ENTRIES", "500"))
+
+class WriteBehindBuffer(PollingWorker):
+    """
+    Buffers low-value timestamp writes (e.g. `User.last_login`) in memory and applies them
+    in one batched UPDATE every `flush_interval` seconds, as soon as `max_entries` rows are
+    pending, and once more on `stop()`. Per row only the latest value is kept, and the
+    UPDATE never moves the column backwards, so workers flushing out of order are harmless.
+    A crash loses at most one interval of these writes.
+    """
+
+    def __init__(
+        self,
+        model,
+        column: str,
+        flush_interval: float = WRITE_BEHIND_FLUSH_SECONDS,
+        max_entries: int = WRITE_BEHIND_MAX_ENTRIES,
+        on_flush: Optional[Callable[[List[Any]], Awaitable[None]]] = None,
+    ):
+        super().__init__(batch_size=max_entries, poll_interval=flush_interval)
+        self.name = f"write_behind_{model.__tablename__}_{column}"
+        self.model = model
+        self.column = column
+        self.on_flush = on_flush
+        self._pending: Dict[Any, Any] = {}
+        self._lock = asyncio.Lock()
+        self._early_flush: Optional[asyncio.Task] = None
+        self.stats = {"recorded": 0, "flushed": 0, "flushes": 0, "failed_flushes": 0}
+
+    def record(self, id, value) -> None:
+        self._pending[id] = value
+        self.stats["recorded"] += 1
+        if len(self._pending) >= self.batch_size and (self._early_flush is None or self._early_flush.done()):
+            self._early_flush = asyncio.create_task(self.flush())
+
+    async def flush(self) -> int:
+        async with self._lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+            table = self.model.__table__
+            col = table.c[self.column]
+            stmt = (
+                update(table)
+                .where(table.c.id == bindparam("_id"), or_(col.is_(None), col < bindparam("_value")))
+                .values({self.column: bindparam("_value")})
+            )
+            try:
+                async with get_session(primary=True) as session:
+                    await session.execute(stmt, [{"_id": id, "_value": value} for id, value in pending.items()])
+                    await session.commit()
+            except Exception as e:
+                # put them back unless a newer value was recorded meanwhile
+                for id, value in pending.items():
+                    self._pending.setdefault(id, value)
+                self.stats["failed_flushes"] += 1
+                logger.warning(f"{self.name}_flush_failed", error=str(e), pending=len(self._pending))
+                return 0
+            self.stats["flushes"] += 1
+            self.stats["flushed"] += len(pending)
+        if self.on_flush is not None:
+            try:
+                await self.on_flush(list(pending))
+            except Exception as e:
+                logger.warning(f"{self.name}_on_flush_failed", error=str(e))
+        return len(pending)
+
+    async def run_once(self) -> int:
+        return await self.flush()
+
+    async def stop(self) -> None:
+        await super().stop()
+        await self.flush()
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "pending": len(self._pending), "running": self.running}
@@ -6,7 +6,23 @@ from src.routers.auth_router import router as auth_router
 from src.routers.user_router import router as user_router
 from src.routers.post_router import router as post_router
 from src.routers.platforms_router import router as platforms_router
+from src.routers.schedule_router import router as schedule_router
+from src.routers.export_router import router as export_router
+from src.routers.import_router import router as import_router
+from src.routers.media_router import router as media_router
+from src.routers.metrics_router import router as metrics_router
 from src.infrastructure.database import init_db
+from src.infrastructure.http_clients import http_clients
+from src.infrastructure.cache import entity_cache
+from src.UAA.utils import revocation_filter
+from src.UAA.revocation import REVOCATION_FILTER_ENABLED
+from src.UAA.password_hasher import password_hasher
+from src.UAA.repository import last_login_buffer
+from src.UAA.credentials import credential_rotator
+from src.infrastructure.media_variants import media_variants
+from src.services.publish_dispatcher import dispatcher, DISPATCHER_ENABLED
+from src.services.outbox_relay import outbox_relay, OUTBOX_RELAY_ENABLED
+from src.services.token_refresher import token_refresher, TOKEN_REFRESH_ENABLED
 from src.middleware.logging import RequestIdMiddleware
 import structlog
 
@@ -33,11 +49,43 @@ app.include_router(auth_router)
 app.include_router(user_router)
 app.include_router(post_router)
 app.include_router(platforms_router)
+app.include_router(schedule_router)
+app.include_router(export_router)
+app.include_router(import_router)
+app.include_router(media_router)
+app.include_router(metrics_router)
 
 @app.on_event("startup")
 async def on_startup():
     await init_db()
+    await http_clients.startup()
+    await media_variants.start()
+    entity_cache.start()
+    last_login_buffer.start()
+    credential_rotator.start()
+    if REVOCATION_FILTER_ENABLED:
+        revocation_filter.start()
+    if DISPATCHER_ENABLED:
+        dispatcher.start()
+    if OUTBOX_RELAY_ENABLED:
+        outbox_relay.start()
+    if TOKEN_REFRESH_ENABLED:
+        token_refresher.start()
     logger.info("app_startup")
 
+@app.on_event("shutdown")
+async def on_shutdown():
+    await dispatcher.stop()
+    await outbox_relay.stop()
+    await token_refresher.stop()
+    await last_login_buffer.stop()
+    await credential_rotator.stop()
+    await http_clients.shutdown()
+    await entity_cache.stop()
+    await revocation_filter.stop()
+    password_hasher.shutdown()
+    await media_variants.shutdown()
+    logger.info("app_shutdown")
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=int(os.getenv("PORT", 8000)), reload=True)
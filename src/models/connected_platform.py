@@ -6,13 +6,14 @@ import uuid
 from sqlalchemy import String, JSON
 
 class ConnectedPlatform(SQLModel, table=True):
-    id: Optional[uuid.UUID] = Field(default=None, primary_key=True)
+    id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
     user_id: uuid.UUID = Field(foreign_key="user.id", index=True)
     provider: str = Field(sa_column=Column(String, index=True))
     provider_user_id: Optional[str] = Field(sa_column=Column(String), default=None)
     access_token_enc: str
     refresh_token_enc: Optional[str] = None
-    token_expires_at: Optional[datetime] = None
+    # indexed for the token refresher's expiry range scan
+    token_expires_at: Optional[datetime] = Field(default=None, index=True)
     scope: Optional[str] = None
     meta: Optional[dict] = Field(sa_column=Column(JSON), default={})
     created_at: datetime = Field(default_factory=datetime.utcnow)
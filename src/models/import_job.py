@@ -0,0 +1,25 @@
+# src/models/import_job.py
+from sqlmodel import SQLModel, Field, Column
+from typing import Optional
+from datetime import datetime
+import uuid
+from sqlalchemy import JSON
+
+class ImportJob(SQLModel, table=True):
+    """
+    Progress of a bulk import. `rows_processed` only advances in the same transaction
+    that writes the rows, so a resumed import skips exactly the rows already handled.
+    """
+    id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
+    user_id: uuid.UUID = Field(foreign_key="user.id", index=True)
+    kind: str  # posts, schedules
+    format: str  # csv, ndjson
+    status: str = Field(default="running")  # running, completed, failed
+    rows_processed: int = Field(default=0)
+    rows_imported: int = Field(default=0)
+    rows_failed: int = Field(default=0)
+    # first IMPORT_MAX_ERRORS per-row errors: [{"row": n, "error": "..."}]
+    errors: Optional[list] = Field(sa_column=Column(JSON), default=[])
+    last_error: Optional[str] = Field(default=None)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
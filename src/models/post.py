@@ -3,10 +3,16 @@ from sqlmodel import SQLModel, Field, Column
 from typing import Optional
 import uuid
 from datetime import datetime
-from sqlalchemy import String, JSON
+from sqlalchemy import String, JSON, Index, text
 
 class Post(SQLModel, table=True):
-    id: Optional[uuid.UUID] = Field(default=None, primary_key=True)
+    # keyset pagination of a user's posts (newest first); draft is carried in the index
+    # so the draft filter is applied without visiting the heap
+    __table_args__ = (
+        Index("ix_post_user_created_id", "user_id", "created_at", "id", postgresql_include=["draft"]),
+    )
+
+    id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
     user_id: uuid.UUID = Field(foreign_key="user.id", index=True)
     title: Optional[str] = Field(default=None)
     content: Optional[str] = Field(default=None)
@@ -15,7 +21,19 @@ class Post(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class Schedule(SQLModel, table=True):
-    id: Optional[uuid.UUID] = Field(default=None, primary_key=True)
+    __table_args__ = (
+        # calendar/range queries: "published this week", "failed yesterday"
+        Index("ix_schedule_status_time", "status", "scheduled_time"),
+        # "pending and due" (the dispatcher's claim query) stays small however much history piles up
+        Index(
+            "ix_schedule_pending_time",
+            "scheduled_time",
+            postgresql_where=text("status = 'pending'"),
+            sqlite_where=text("status = 'pending'"),
+        ),
+    )
+
+    id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
     post_id: uuid.UUID = Field(foreign_key="post.id", index=True)
     connected_platform_id: uuid.UUID = Field(foreign_key="connectedplatform.id", index=True)
     scheduled_time: datetime
@@ -23,5 +41,24 @@ class Schedule(SQLModel, table=True):
     last_error: Optional[str] = Field(default=None)
     external_post_id: Optional[str] = Field(default=None)
     retry_count: int = Field(default=0)
+    # set when a dispatcher claims the row; "running" rows older than the lease are reclaimed
+    claimed_at: Optional[datetime] = Field(default=None)
     meta: Optional[dict] = Field(sa_column=Column(JSON), default={})
     created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class PublishJob(SQLModel, table=True):
+    """
+    Transactional outbox entry: committed together with its Post and drained by the outbox relay.
+    """
+    __table_args__ = (Index("ix_publishjob_status_available_at", "status", "available_at"),)
+
+    id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
+    post_id: uuid.UUID = Field(foreign_key="post.id", index=True)
+    status: str = Field(default="pending")  # pending, running, published, failed
+    attempts: int = Field(default=0)
+    last_error: Optional[str] = Field(default=None)
+    external_post_id: Optional[str] = Field(default=None)
+    available_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    # also the claim time while "running": the relay reclaims jobs running past their lease
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -6,8 +6,9 @@ import structlog
 import os
 
 from ..dependencies.db import get_session_dep
-from ..UAA.repository import UserRepository
+from ..UAA.repository import CachedUserRepository
 from ..UAA.services import UserService, AuthenticationError
+from ..UAA.password_hasher import PasswordHasherBusy
 from ..UAA.schemas import UserCreate, Token
 from ..UAA import utils
 
@@ -24,7 +25,7 @@ COOKIE_SAMESITE = os.getenv("COOKIE_SAMESITE", "lax")
 
 @router.post("/register", response_model=dict, status_code=status.HTTP_201_CREATED)
 async def register(user_in: UserCreate, session: AsyncSession = Depends(get_session_dep)):
-    repo = UserRepository(session)
+    repo = CachedUserRepository(session)
     svc = UserService(repo, session)
     try:
         created = await svc.register_user(user_in)
@@ -32,6 +33,9 @@ async def register(user_in: UserCreate, session: AsyncSession = Depends(get_sess
     except ValueError as e:
         logger.info("register_validation_failed", error=str(e), email=user_in.email)
         raise HTTPException(status_code=400, detail=str(e))
+    except PasswordHasherBusy as e:
+        logger.warning("register_hasher_busy", error=str(e))
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Service busy, retry shortly", headers={"Retry-After": "1"})
 
 @router.post("/login", response_model=Token)
 async def login(form_data: UserCreate, response: Response, session: AsyncSession = Depends(get_session_dep)):
@@ -40,7 +44,7 @@ async def login(form_data: UserCreate, response: Response, session: AsyncSession
     We use email+password for auth; username included for compatibility.
     Returns access token in body and sets refresh token as HttpOnly cookie.
     """
-    repo = UserRepository(session)
+    repo = CachedUserRepository(session)
     svc = UserService(repo, session)
     try:
         user = await svc.authenticate_user(form_data.email, form_data.password)
@@ -48,6 +52,9 @@ async def login(form_data: UserCreate, response: Response, session: AsyncSession
         # Do not reveal whether email exists
         logger.warning("login_failed", reason=str(e), email=form_data.email)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    except PasswordHasherBusy as e:
+        logger.warning("login_hasher_busy", error=str(e))
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Service busy, retry shortly", headers={"Retry-After": "1"})
 
     # issue tokens
     tokens = await svc.issue_tokens(user)
@@ -123,7 +130,7 @@ async def otp_request(user_id: str, action: str = "login", session: AsyncSession
     - در حالت production، OTP در response برگردانده نمی‌شود؛ فقط HTTP 202 یا پیام مناسب برمی‌گردد.
       در حالت development، برای تست OTP مقدار آن نیز بازگردانده می‌شود.
     """
-    repo = UserRepository(session)
+    repo = CachedUserRepository(session)
     user = await repo.get_by_id(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="user not found")
@@ -0,0 +1,33 @@
+# src/routers/export_router.py
+from typing import Literal, Optional
+import uuid
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from src.dependencies.auth import get_current_user
+from src.services.export_service import stream_export
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+@router.get("/{kind}")
+async def export_rows(
+    kind: Literal["posts", "schedules"],
+    format: Literal["ndjson", "csv"] = "ndjson",
+    gzip: bool = False,
+    user_id: Optional[uuid.UUID] = None,
+    current_user = Depends(get_current_user),
+):
+    """
+    Stream all of the current user's posts or schedules. Superusers may export another
+    user's data with `user_id`. With `gzip=true` the body is a .gz file.
+    """
+    if user_id is not None and user_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="superuser required")
+    owner_id = user_id or current_user.id
+    filename = f"{kind}-{owner_id}.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        stream_export(kind, str(owner_id), fmt=format, gzip=gzip),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
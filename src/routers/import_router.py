@@ -0,0 +1,43 @@
+# src/routers/import_router.py
+from typing import Literal, Optional
+import uuid
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.dependencies.db import get_session_dep
+from src.dependencies.auth import get_current_user
+from src.schemas.post_schema import ImportJobRead
+from src.services.import_service import ImportService
+
+router = APIRouter(prefix="/imports", tags=["imports"])
+
+@router.post("/{kind}", response_model=ImportJobRead)
+async def import_rows(
+    kind: Literal["posts", "schedules"],
+    request: Request,
+    format: Literal["csv", "ndjson"] = "csv",
+    job_id: Optional[uuid.UUID] = None,
+    session: AsyncSession = Depends(get_session_dep),
+    current_user = Depends(get_current_user),
+):
+    """
+    Import posts or schedules from the raw request body (CSV with a header row, or NDJSON),
+    parsed as it is received. Posts take title, content, media_path and optionally id, draft,
+    created_at; schedules take post_id, connected_platform_id, scheduled_time.
+    Rows that fail validation are reported per row and skipped. If the import fails midway,
+    re-send the same file with `job_id` to continue after the last committed chunk.
+    """
+    svc = ImportService(session)
+    try:
+        job = await svc.start_job(str(current_user.id), kind, format, job_id=job_id)
+    except LookupError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return await svc.run(job, request.stream())
+
+@router.get("/{job_id}", response_model=ImportJobRead)
+async def get_import_job(job_id: uuid.UUID, session: AsyncSession = Depends(get_session_dep), current_user = Depends(get_current_user)):
+    job = await ImportService(session).get_job(str(current_user.id), job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="import job not found")
+    return job
@@ -0,0 +1,47 @@
+# src/routers/media_router.py
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, status
+from fastapi.responses import FileResponse
+from src.dependencies.auth import get_current_user
+from src.infrastructure.media_store import MediaEmpty, MediaNotFound, MediaTooLarge, media_store
+from src.infrastructure.media_variants import WEB_PREVIEW, media_variants
+
+router = APIRouter(prefix="/media", tags=["media"])
+
+@router.post("/", status_code=status.HTTP_201_CREATED, response_model=dict)
+async def upload_media(request: Request, current_user = Depends(get_current_user)):
+    """
+    Upload one media file as the raw request body (set its Content-Type). The body is
+    streamed to the media store; identical content is stored once. Use the returned
+    `media_path` as a post's media_path to have the media itself published.
+    """
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > media_store.max_bytes:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=f"media larger than {media_store.max_bytes} bytes")
+    content_type = (request.headers.get("content-type") or "application/octet-stream").split(";")[0].strip()
+    try:
+        stored = await media_store.put_stream(request.stream(), content_type=content_type)
+    except MediaTooLarge as exc:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(exc))
+    except MediaEmpty as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {
+        "media_path": stored.media_path,
+        "sha256": stored.sha256,
+        "size": stored.size,
+        "content_type": stored.content_type,
+        "deduplicated": stored.deduplicated,
+    }
+
+@router.get("/{sha256}/preview")
+async def media_preview(sha256: str = Path(..., pattern="^[0-9a-f]{64}$"), current_user = Depends(get_current_user)):
+    """
+    A 640 px WebP preview of an uploaded image, rendered ahead of time when a schedule
+    is created (or on first request).
+    """
+    try:
+        path = await media_variants.get(sha256, WEB_PREVIEW)
+    except MediaNotFound:
+        raise HTTPException(status_code=404, detail="Media not found")
+    if path is None:
+        raise HTTPException(status_code=404, detail="No preview for this media")
+    return FileResponse(path, media_type=WEB_PREVIEW.content_type)
@@ -0,0 +1,12 @@
+# src/routers/metrics_router.py
+from fastapi import APIRouter, Depends, HTTPException, status
+from src.dependencies.auth import get_current_user
+from src.infrastructure import metrics
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+@router.get("/", response_model=dict)
+async def get_metrics(current_user = Depends(get_current_user)):
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="superuser required")
+    return metrics.snapshot()
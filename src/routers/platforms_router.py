@@ -2,11 +2,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import JSONResponse
 from src.dependencies.db import get_session_dep
+from src.dependencies.http import get_http_client
+from src.infrastructure.database import unit_of_work
+from src.dependencies.auth import get_current_user
 from sqlmodel.ext.asyncio.session import AsyncSession
 from src.UAA.utils import create_oauth_state, pop_oauth_state, encrypt_token
-from src.infrastructure.platforms_repo import PlatformsRepository
+from src.infrastructure.platforms_repo import CachedPlatformsRepository
 from src.UAA.repository import UserRepository
 from src.models.connected_platform import ConnectedPlatform
+from src.schemas.platform_schema import TelegramConnect
+from src.infrastructure.telegram_bot_client import TelegramBotClient, TelegramBotError
 import os
 import httpx
 from datetime import datetime, timedelta
@@ -38,7 +43,7 @@ async def instagram_connect_start(user_id: str, session: AsyncSession = Depends(
     return {"auth_url": str(url)}
 
 @router.get("/instagram/callback")
-async def instagram_callback(code: str or None = None, state: str or None = None, session: AsyncSession = Depends(get_session_dep)):
+async def instagram_callback(code: str or None = None, state: str or None = None, session: AsyncSession = Depends(get_session_dep), client: httpx.AsyncClient = Depends(get_http_client("instagram"))):
     if not code or not state:
         raise HTTPException(status_code=400, detail="Missing code or state")
 
@@ -58,15 +63,14 @@ async def instagram_callback(code: str or None = None, state: str or None = None
         "code": code,
     }
 
-    async with httpx.AsyncClient(timeout=30) as client:
-        try:
-            resp = await client.get(INSTAGRAM_TOKEN_URL, params=params)
-            resp.raise_for_status()
-            token_data = resp.json()
-        except httpx.HTTPStatusError as e:
-            raise HTTPException(status_code=502, detail=f"Token exchange failed: {e.response.text}")
-        except Exception as e:
-            raise HTTPException(status_code=502, detail="Token exchange error")
+    try:
+        resp = await client.get(INSTAGRAM_TOKEN_URL, params=params)
+        resp.raise_for_status()
+        token_data = resp.json()
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=502, detail=f"Token exchange failed: {e.response.text}")
+    except Exception as e:
+        raise HTTPException(status_code=502, detail="Token exchange error")
 
     access_token = token_data.get("access_token")
     expires_in = token_data.get("expires_in")
@@ -95,11 +99,14 @@ async def instagram_callback(code: str or None = None, state: str or None = None
     access_enc = encrypt_token(access_token)
     refresh_enc = encrypt_token(refresh_token) if refresh_token else None
 
-    repo = PlatformsRepository(session)
+    repo = CachedPlatformsRepository(session)
     existing = await repo.get_by_user_and_provider(user_id, "instagram")
     if existing:
-        await repo.update_tokens(existing, access_enc, refresh_enc, token_expires_at)
-        cp = existing
+        # token + account id refresh commit together
+        async with unit_of_work(session):
+            cp = await repo.update_tokens(existing, access_enc, refresh_enc, token_expires_at)
+            if provider_user_id and cp.provider_user_id != provider_user_id:
+                cp = await repo.update_provider_user_id(cp, provider_user_id)
     else:
         cp = ConnectedPlatform(
             user_id=user_id,
@@ -113,3 +120,41 @@ async def instagram_callback(code: str or None = None, state: str or None = None
         cp = await repo.create(cp)
 
     return JSONResponse({"status": "connected", "provider": "instagram", "connected_id": str(cp.id)})
+
+@router.post("/telegram/connect")
+async def telegram_connect(payload: TelegramConnect, session: AsyncSession = Depends(get_session_dep), current_user = Depends(get_current_user), client: httpx.AsyncClient = Depends(get_http_client("telegram"))):
+    """
+    Connect a Telegram chat or channel as a publishing target. The caller must supply
+    their own bot's token and that bot must be able to see the chat; the shared
+    TELEGRAM_BOT_TOKEN bot is never accepted, since any user could otherwise register
+    any chat it can see. The chat id is stored as provider_user_id and the bot token,
+    encrypted, as the access token. Connecting the same chat again updates the existing record.
+    """
+    if not payload.bot_token or payload.bot_token == os.getenv("TELEGRAM_BOT_TOKEN"):
+        raise HTTPException(status_code=400, detail="Use your own bot token, not the platform bot")
+    try:
+        bot = TelegramBotClient(bot_token=payload.bot_token, http_client=client)
+        chat = await bot.get_chat(payload.chat_id)
+    except TelegramBotError as exc:
+        raise HTTPException(status_code=400, detail=f"Telegram chat not reachable: {exc}")
+
+    chat_id = str(chat.get("id") or payload.chat_id)
+    meta = {"title": chat.get("title") or chat.get("username"), "type": chat.get("type")}
+    token_enc = encrypt_token(bot.bot_token)
+
+    repo = CachedPlatformsRepository(session)
+    existing = next(
+        (cp for cp in await repo.list_by_user(str(current_user.id)) if cp.provider == "telegram" and cp.provider_user_id == chat_id),
+        None,
+    )
+    if existing:
+        cp = await repo.update_tokens(existing, token_enc, None, None, meta)
+    else:
+        cp = await repo.create(ConnectedPlatform(
+            user_id=current_user.id,
+            provider="telegram",
+            provider_user_id=chat_id,
+            access_token_enc=token_enc,
+            meta=meta,
+        ))
+    return {"status": "connected", "provider": "telegram", "connected_id": str(cp.id), "chat_id": chat_id, "title": meta["title"]}
@@ -1,28 +1,115 @@
 # src/routers/post_router.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from typing import List, Optional, Union
+import uuid
+import httpx
 from sqlmodel.ext.asyncio.session import AsyncSession
 from src.dependencies.db import get_session_dep
+from src.dependencies.http import get_http_client
 from src.dependencies.auth import get_current_user
-from src.schemas.post_schema import PostCreate, PostRead, ScheduleCreate
-from src.services.post_service import PostService
+from src.schemas.post_schema import PostCreate, PostRead, PostPage, ScheduleCreate, PublishJobAccepted, PublishJobRead, PostBulkResult, ScheduleBatchCreate, ScheduleBatchResult, TelegramFanoutCreate, TelegramFanoutResult
+from src.services.post_service import PostService, ScheduleBatchTooLarge, POST_PUBLISH_MODE, MAX_BULK_POSTS, MAX_PAGE_SIZE
 from src.infrastructure.telegram_bot_client import TelegramBotError
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
-@router.post("/", response_model=PostRead)
-async def create_post(payload: PostCreate, session: AsyncSession = Depends(get_session_dep), current_user = Depends(get_current_user)):
+@router.get("/", response_model=PostPage)
+async def list_posts(
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    draft: Optional[bool] = None,
+    session: AsyncSession = Depends(get_session_dep),
+    current_user = Depends(get_current_user),
+):
+    """
+    The current user's posts, newest first. Pass `next_cursor` from the previous
+    page as `cursor` to continue; it is null on the last page.
+    """
     svc = PostService(session)
+    try:
+        posts, next_cursor = await svc.list_posts(user_id=str(current_user.id), limit=limit, cursor=cursor, draft=draft)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"items": posts, "next_cursor": next_cursor}
+
+@router.post("/", response_model=Union[PublishJobAccepted, PostRead])
+async def create_post(payload: PostCreate, response: Response, session: AsyncSession = Depends(get_session_dep), current_user = Depends(get_current_user), telegram_http: httpx.AsyncClient = Depends(get_http_client("telegram"))):
+    """
+    In outbox mode (default) the post and its publish job are committed together and
+    202 is returned with the job id; poll GET /posts/jobs/{job_id} for the outcome.
+    With POST_PUBLISH_MODE=sync the post is published to Telegram before it is committed.
+    """
+    svc = PostService(session, http_client=telegram_http)
+    if POST_PUBLISH_MODE != "sync":
+        response.status_code = status.HTTP_202_ACCEPTED
+        return await svc.enqueue_post(user_id=str(current_user.id), payload=payload)
     try:
         post = await svc.create_post(user_id=str(current_user.id), payload=payload)
         return post
     except TelegramBotError as exc:
         raise HTTPException(status_code=502, detail=str(exc))
 
+@router.post("/bulk", response_model=PostBulkResult)
+async def create_posts_bulk(payload: List[PostCreate], response: Response, session: AsyncSession = Depends(get_session_dep), current_user = Depends(get_current_user), telegram_http: httpx.AsyncClient = Depends(get_http_client("telegram"))):
+    """
+    Create many posts in one request. Each item gets its own result; a failing item
+    does not fail the others. Returns 202 in outbox mode and 200 with POST_PUBLISH_MODE=sync.
+    """
+    if not payload:
+        raise HTTPException(status_code=400, detail="no posts given")
+    if len(payload) > MAX_BULK_POSTS:
+        raise HTTPException(status_code=413, detail=f"at most {MAX_BULK_POSTS} posts per request")
+    svc = PostService(session, http_client=telegram_http)
+    sync = POST_PUBLISH_MODE == "sync"
+    results = await svc.create_posts_bulk(user_id=str(current_user.id), payloads=payload, sync=sync)
+    if not sync:
+        response.status_code = status.HTTP_202_ACCEPTED
+    failed = sum(1 for r in results if r["status"] == "failed")
+    return {"created": len(results) - failed, "failed": failed, "results": results}
+
 @router.post("/{post_id}/schedule", response_model=dict)
-async def schedule_post(post_id: str, payload: ScheduleCreate, session: AsyncSession = Depends(get_session_dep), current_user = Depends(get_current_user)):
-    svc = PostService(session)
+async def schedule_post(post_id: str, payload: ScheduleCreate, session: AsyncSession = Depends(get_session_dep), current_user = Depends(get_current_user), telegram_http: httpx.AsyncClient = Depends(get_http_client("telegram"))):
+    svc = PostService(session, http_client=telegram_http)
     try:
         sched = await svc.schedule_post(post_id, payload)
         return {"schedule_id": str(sched.id), "status": sched.status}
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc))
+
+@router.post("/{post_id}/schedule/batch", response_model=ScheduleBatchResult, status_code=status.HTTP_201_CREATED)
+async def schedule_post_batch(post_id: str, payload: ScheduleBatchCreate, session: AsyncSession = Depends(get_session_dep), current_user = Depends(get_current_user)):
+    svc = PostService(session)
+    try:
+        schedules = await svc.schedule_post_batch(user_id=str(current_user.id), post_id=post_id, payload=payload)
+    except LookupError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    except ScheduleBatchTooLarge as exc:
+        # same status as an oversized /posts/bulk
+        raise HTTPException(status_code=413, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"post_id": post_id, "count": len(schedules), "schedules": schedules}
+
+@router.post("/{post_id}/publish/telegram", response_model=TelegramFanoutResult)
+async def publish_to_telegram_chats(post_id: str, payload: TelegramFanoutCreate, session: AsyncSession = Depends(get_session_dep), current_user = Depends(get_current_user), telegram_http: httpx.AsyncClient = Depends(get_http_client("telegram"))):
+    """
+    Publish the post now to the given connected Telegram chats (default: all of them).
+    Every chat is attempted; per-chat results are returned and recorded as schedules.
+    """
+    svc = PostService(session, http_client=telegram_http)
+    try:
+        results = await svc.fan_out_telegram(user_id=str(current_user.id), post_id=post_id, connected_platform_ids=payload.connected_platform_ids)
+    except LookupError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    except TelegramBotError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    published = sum(1 for r in results if r["status"] == "published")
+    return {"post_id": post_id, "published": published, "failed": len(results) - published, "results": results}
+
+@router.get("/jobs/{job_id}", response_model=PublishJobRead)
+async def get_publish_job(job_id: uuid.UUID, session: AsyncSession = Depends(get_session_dep), current_user = Depends(get_current_user)):
+    svc = PostService(session)
+    job = await svc.get_publish_job(user_id=str(current_user.id), job_id=job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="publish job not found")
+    return job
@@ -0,0 +1,33 @@
+# src/routers/schedule_router.py
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.dependencies.db import get_session_dep
+from src.dependencies.auth import get_current_user
+from src.schemas.post_schema import ScheduleCalendar
+from src.services.schedule_service import ScheduleService, MAX_SCHEDULE_ITEMS
+
+router = APIRouter(prefix="/schedules", tags=["schedules"])
+
+@router.get("/", response_model=ScheduleCalendar)
+async def list_schedules(
+    start: datetime = Query(..., alias="from"),
+    end: datetime = Query(..., alias="to"),
+    status: Optional[str] = None,
+    group_by: Optional[Literal["day"]] = None,
+    limit: int = Query(MAX_SCHEDULE_ITEMS, ge=1, le=MAX_SCHEDULE_ITEMS),
+    session: AsyncSession = Depends(get_session_dep),
+    current_user = Depends(get_current_user),
+):
+    """
+    The current user's schedules with scheduled_time in [from, to), optionally filtered
+    by status. With `group_by=day` returns counts per day and platform instead of items.
+    """
+    svc = ScheduleService(session)
+    try:
+        if group_by == "day":
+            return {"days": await svc.count_per_day(str(current_user.id), start, end, status)}
+        return {"items": await svc.list_range(str(current_user.id), start, end, status, limit=limit)}
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
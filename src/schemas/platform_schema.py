@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+class TelegramConnect(BaseModel):
+    # numeric chat id or @channelusername; the bot must already be a member/admin
+    chat_id: str
+    # the user's own bot; holding its token is what proves control of the chat
+    bot_token: str
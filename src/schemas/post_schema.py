@@ -1,8 +1,8 @@
 # src/schemas/post_schema.py
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 
 class PostCreate(BaseModel):
     title: Optional[str]
@@ -18,6 +18,108 @@ class PostRead(BaseModel):
     draft: bool
     created_at: datetime
 
+class PostPage(BaseModel):
+    items: List[PostRead]
+    # opaque; pass back as ?cursor= to get the next page, null on the last page
+    next_cursor: Optional[str] = None
+
 class ScheduleCreate(BaseModel):
     connected_platform_id: uuid.UUID
     scheduled_time: datetime
+
+class ScheduleBatchCreate(BaseModel):
+    # every platform is scheduled at every time (matrix of platform x time)
+    connected_platform_ids: List[uuid.UUID]
+    scheduled_times: List[datetime]
+
+class ScheduleBatchItem(BaseModel):
+    schedule_id: uuid.UUID
+    connected_platform_id: uuid.UUID
+    scheduled_time: datetime
+
+class ScheduleBatchResult(BaseModel):
+    post_id: uuid.UUID
+    count: int
+    schedules: List[ScheduleBatchItem]
+
+class PublishJobAccepted(BaseModel):
+    job_id: uuid.UUID
+    post_id: uuid.UUID
+    status: str
+
+class PublishJobRead(BaseModel):
+    id: uuid.UUID
+    post_id: uuid.UUID
+    status: str
+    attempts: int
+    last_error: Optional[str]
+    external_post_id: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+
+class PostBulkItemResult(BaseModel):
+    index: int
+    status: str  # queued, published, failed
+    post_id: Optional[uuid.UUID] = None
+    job_id: Optional[uuid.UUID] = None
+    error: Optional[str] = None
+
+class PostBulkResult(BaseModel):
+    created: int
+    failed: int
+    results: List[PostBulkItemResult]
+
+class ScheduleCalendarItem(BaseModel):
+    schedule_id: uuid.UUID
+    scheduled_time: datetime
+    status: str
+    external_post_id: Optional[str]
+    post_id: uuid.UUID
+    post_title: Optional[str]
+    connected_platform_id: uuid.UUID
+    provider: str
+
+class ScheduleDayCount(BaseModel):
+    day: date
+    connected_platform_id: uuid.UUID
+    provider: str
+    count: int
+
+class ScheduleCalendar(BaseModel):
+    items: Optional[List[ScheduleCalendarItem]] = None
+    days: Optional[List[ScheduleDayCount]] = None
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+class ImportJobRead(BaseModel):
+    id: uuid.UUID
+    kind: str
+    format: str
+    status: str
+    rows_processed: int
+    rows_imported: int
+    rows_failed: int
+    errors: List[ImportRowError] = []
+    last_error: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+
+class TelegramFanoutCreate(BaseModel):
+    # default: every Telegram chat the user has connected
+    connected_platform_ids: Optional[List[uuid.UUID]] = None
+
+class TelegramFanoutItem(BaseModel):
+    connected_platform_id: uuid.UUID
+    chat_id: Optional[str]
+    schedule_id: uuid.UUID
+    status: str  # published, failed
+    message_id: Optional[str] = None
+    error: Optional[str] = None
+
+class TelegramFanoutResult(BaseModel):
+    post_id: uuid.UUID
+    published: int
+    failed: int
+    results: List[TelegramFanoutItem]
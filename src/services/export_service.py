@@ -0,0 +1,90 @@
+# src/services/export_service.py
+import csv
+import io
+import json
+import os
+import uuid
+import zlib
+from datetime import date, datetime
+from typing import AsyncIterator, Dict, List
+
+from sqlalchemy import select
+
+from src.infrastructure.database import get_session
+from src.models.post import Post, Schedule
+
+EXPORT_YIELD_PER = int(os.getenv("EXPORT_YIELD_PER", "2000"))
+EXPORT_CHUNK_BYTES = int(os.getenv("EXPORT_CHUNK_BYTES", str(64 * 1024)))
+
+EXPORT_COLUMNS: Dict[str, List[str]] = {
+    "posts": [c.name for c in Post.__table__.columns],
+    "schedules": [c.name for c in Schedule.__table__.columns],
+}
+
+def _export_query(kind: str, user_id: uuid.UUID):
+    if kind == "posts":
+        post = Post.__table__
+        return select(post).where(post.c.user_id == user_id).order_by(post.c.created_at, post.c.id)
+    schedule, post = Schedule.__table__, Post.__table__
+    return (
+        select(schedule)
+        .join(post, post.c.id == schedule.c.post_id)
+        .where(post.c.user_id == user_id)
+        .order_by(schedule.c.scheduled_time, schedule.c.id)
+    )
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+def _csv_cell(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return _plain(value)
+
+async def _rows(kind: str, user_id: uuid.UUID) -> AsyncIterator[dict]:
+    # own session: the request-scoped one is closed before a streamed body is sent
+    async with get_session() as session:
+        result = await session.stream(_export_query(kind, user_id).execution_options(yield_per=EXPORT_YIELD_PER))
+        async for row in result.mappings():
+            yield row
+
+async def stream_export(kind: str, user_id: str, fmt: str = "ndjson", gzip: bool = False) -> AsyncIterator[bytes]:
+    """
+    Stream every `kind` row ("posts" or "schedules") of the user as NDJSON or CSV.
+    Rows come from a server-side cursor `EXPORT_YIELD_PER` at a time and are encoded into
+    ~`EXPORT_CHUNK_BYTES` chunks (gzip-compressed on the fly when asked), so memory stays
+    constant however many rows there are.
+    """
+    columns = EXPORT_COLUMNS[kind]
+    compressor = zlib.compressobj(wbits=31) if gzip else None  # wbits=31: gzip container
+    buf = io.StringIO()
+    writer = None
+    if fmt == "csv":
+        writer = csv.writer(buf)
+        writer.writerow(columns)
+
+    def drain() -> bytes:
+        data = buf.getvalue().encode()
+        buf.seek(0)
+        buf.truncate()
+        return compressor.compress(data) if compressor else data
+
+    async for row in _rows(kind, uuid.UUID(str(user_id))):
+        if writer is not None:
+            writer.writerow([_csv_cell(row[c]) for c in columns])
+        else:
+            buf.write(json.dumps({c: _plain(row[c]) for c in columns}, default=str))
+            buf.write("\n")
+        if buf.tell() >= EXPORT_CHUNK_BYTES:
+            chunk = drain()
+            if chunk:
+                yield chunk
+    tail = drain()
+    if compressor:
+        tail += compressor.flush()
+    if tail:
+        yield tail
@@ -0,0 +1,322 @@
+# src/services/import_service.py
+import argparse
+import asyncio
+import codecs
+import csv
+import json
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import structlog
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.infrastructure.database import engine, get_session, init_db
+from src.models.connected_platform import ConnectedPlatform
+from src.models.import_job import ImportJob
+from src.models.post import Post, Schedule
+from src.schemas.post_schema import PostCreate, ScheduleCreate
+
+logger = structlog.get_logger(__name__)
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "5000"))
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+IMPORT_KINDS = ("posts", "schedules")
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# (row number, parsed record or the parse error)
+Record = Tuple[int, object]
+
+async def _lines(body: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for data in body:
+        pending += decoder.decode(data)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+async def iter_records(body: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Record]:
+    """
+    Parse an upload incrementally into (row number, dict) pairs; rows are numbered from 1
+    (the CSV header is not a row). Unparseable rows are yielded with the exception instead.
+    """
+    row = 0
+    if fmt == "ndjson":
+        async for line in _lines(body):
+            if not line.strip():
+                continue
+            row += 1
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("row is not a JSON object")
+                yield row, record
+            except ValueError as e:
+                yield row, e
+        return
+
+    header: Optional[List[str]] = None
+    text = ""
+    async for line in _lines(body):
+        # a quoted field may contain newlines: keep reading until the quotes balance
+        text = f"{text}\n{line}" if text else line
+        if text.count('"') % 2:
+            continue
+        record, text = text, ""
+        if not record.strip():
+            continue
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [h.strip() for h in values]
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, ValueError(f"expected {len(header)} columns, got {len(values)}")
+            continue
+        # empty CSV cells mean "not set"
+        yield row, {k: (v if v != "" else None) for k, v in zip(header, values)}
+    if text:
+        yield row + 1, ValueError("unterminated quoted field")
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def _error_message(e: Exception) -> str:
+    if isinstance(e, ValidationError):
+        return "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
+    return str(e)
+
+class ImportService:
+    """
+    Bulk import of posts or schedules for one user. Rows are validated in chunks of
+    IMPORT_CHUNK_SIZE; each chunk's valid rows and the job's progress are committed
+    together, with COPY on Postgres and a batched executemany INSERT elsewhere.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_job(self, user_id: str, job_id) -> Optional[ImportJob]:
+        q = select(ImportJob).where(ImportJob.id == job_id, ImportJob.user_id == uuid.UUID(str(user_id)))
+        res = await self.session.execute(q)
+        return res.scalar_one_or_none()
+
+    async def start_job(self, user_id: str, kind: str, fmt: str, job_id=None) -> ImportJob:
+        """
+        Create a job, or reopen `job_id` to resume it: rows it already processed are skipped.
+        """
+        if kind not in IMPORT_KINDS:
+            raise ValueError(f"kind must be one of {', '.join(IMPORT_KINDS)}")
+        if fmt not in IMPORT_FORMATS:
+            raise ValueError(f"format must be one of {', '.join(IMPORT_FORMATS)}")
+        if job_id is None:
+            job = ImportJob(user_id=uuid.UUID(str(user_id)), kind=kind, format=fmt)
+            self.session.add(job)
+        else:
+            job = await self.get_job(user_id, job_id)
+            if not job:
+                raise LookupError("import job not found")
+            if (job.kind, job.format) != (kind, fmt):
+                raise ValueError(f"import job {job.id} is a {job.kind} {job.format} import")
+            if job.status == "completed":
+                raise ValueError(f"import job {job.id} is already completed")
+            job.status = "running"
+            job.last_error = None
+            job.updated_at = datetime.utcnow()
+        await self.session.commit()
+        return job
+
+    async def run(self, job: ImportJob, body: AsyncIterator[bytes]) -> ImportJob:
+        skip = job.rows_processed
+        chunk: List[Record] = []
+        try:
+            async for row, record in iter_records(body, job.format):
+                if row <= skip:
+                    continue
+                chunk.append((row, record))
+                if len(chunk) >= IMPORT_CHUNK_SIZE:
+                    await self._process_chunk(job, chunk)
+                    chunk = []
+            if chunk:
+                await self._process_chunk(job, chunk)
+        except Exception as e:
+            # progress up to the last committed chunk is kept; resume with the job id
+            logger.exception("import_failed", job_id=str(job.id), rows_processed=skip, error=str(e))
+            await self.session.rollback()
+            await self.session.refresh(job)
+            job.status = "failed"
+            job.last_error = _error_message(e)
+            job.updated_at = datetime.utcnow()
+            await self.session.commit()
+            return job
+        job.status = "completed"
+        job.updated_at = datetime.utcnow()
+        await self.session.commit()
+        logger.info("import_completed", job_id=str(job.id), imported=job.rows_imported, failed=job.rows_failed)
+        return job
+
+    async def _process_chunk(self, job: ImportJob, chunk: List[Record]) -> None:
+        errors: List[dict] = []
+        if job.kind == "posts":
+            rows = await self._validate_posts(job.user_id, chunk, errors)
+            table, columns = Post.__tablename__, ["id", "user_id", "title", "content", "media_path", "draft", "created_at"]
+            model = Post
+        else:
+            rows = await self._validate_schedules(job.user_id, chunk, errors)
+            table, columns = Schedule.__tablename__, ["id", "post_id", "connected_platform_id", "scheduled_time", "status", "retry_count", "meta", "created_at"]
+            model = Schedule
+
+        if rows:
+            if engine.dialect.name == "postgresql":
+                conn = await self.session.connection()
+                raw = await conn.get_raw_connection()
+                # runs on the session's connection, inside its transaction
+                records = [tuple(json.dumps(r[c]) if c == "meta" else r[c] for c in columns) for r in rows]
+                await raw.driver_connection.copy_records_to_table(table, records=records, columns=columns)
+            else:
+                await self.session.execute(insert(model), rows)
+
+        job.rows_processed = chunk[-1][0]
+        job.rows_imported += len(rows)
+        job.rows_failed += len(errors)
+        room = IMPORT_MAX_ERRORS - len(job.errors or [])
+        if errors and room > 0:
+            job.errors = (job.errors or []) + errors[:room]
+        job.updated_at = datetime.utcnow()
+        self.session.add(job)
+        await self.session.commit()
+
+    async def _validate_posts(self, user_id: uuid.UUID, chunk: List[Record], errors: List[dict]) -> List[dict]:
+        now = datetime.utcnow()
+        rows: List[dict] = []
+        row_numbers: Dict[uuid.UUID, int] = {}
+        for row, record in chunk:
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                payload = PostCreate(**{k: record.get(k) for k in ("title", "content", "media_path")})
+                if not (payload.title or payload.content or payload.media_path):
+                    raise ValueError("Post content is empty")
+                # an explicit id lets a schedules import reference posts from the same migration
+                post_id = uuid.UUID(str(record["id"])) if record.get("id") else uuid.uuid4()
+                if post_id in row_numbers:
+                    raise ValueError(f"duplicate id {post_id} (row {row_numbers[post_id]})")
+                draft = record.get("draft")
+                created_at = record.get("created_at")
+                rows.append({
+                    "id": post_id,
+                    "user_id": user_id,
+                    "title": payload.title,
+                    "content": payload.content,
+                    "media_path": payload.media_path,
+                    "draft": True if draft is None else str(draft).lower() in ("1", "true", "yes"),
+                    "created_at": _naive_utc(datetime.fromisoformat(str(created_at))) if created_at else now,
+                })
+                row_numbers[post_id] = row
+            except Exception as e:
+                errors.append({"row": row, "error": _error_message(e)})
+
+        if row_numbers:
+            q = select(Post.id).where(Post.id.in_(list(row_numbers)))
+            taken = set((await self.session.execute(q)).scalars().all())
+            if taken:
+                for post_id in taken:
+                    errors.append({"row": row_numbers[post_id], "error": f"post {post_id} already exists"})
+                rows = [r for r in rows if r["id"] not in taken]
+        errors.sort(key=lambda e: e["row"])
+        return rows
+
+    async def _validate_schedules(self, user_id: uuid.UUID, chunk: List[Record], errors: List[dict]) -> List[dict]:
+        now = datetime.utcnow()
+        candidates: List[Tuple[int, dict]] = []
+        for row, record in chunk:
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                payload = ScheduleCreate(**{k: record.get(k) for k in ("connected_platform_id", "scheduled_time")})
+                if not record.get("post_id"):
+                    raise ValueError("post_id: field required")
+                candidates.append((row, {
+                    "id": uuid.uuid4(),
+                    "post_id": uuid.UUID(str(record["post_id"])),
+                    "connected_platform_id": payload.connected_platform_id,
+                    "scheduled_time": _naive_utc(payload.scheduled_time),
+                    "status": "pending",
+                    "retry_count": 0,
+                    "meta": {},
+                    "created_at": now,
+                }))
+            except Exception as e:
+                errors.append({"row": row, "error": _error_message(e)})
+        if not candidates:
+            return []
+
+        # ownership of every referenced post and platform, one IN query each
+        post_ids = {r["post_id"] for _, r in candidates}
+        cp_ids = {r["connected_platform_id"] for _, r in candidates}
+        q = select(Post.id).where(Post.id.in_(list(post_ids)), Post.user_id == user_id)
+        owned_posts = set((await self.session.execute(q)).scalars().all())
+        q2 = select(ConnectedPlatform.id).where(ConnectedPlatform.id.in_(list(cp_ids)), ConnectedPlatform.user_id == user_id)
+        owned_platforms = set((await self.session.execute(q2)).scalars().all())
+
+        rows: List[dict] = []
+        for row, r in candidates:
+            if r["post_id"] not in owned_posts:
+                errors.append({"row": row, "error": f"post not found: {r['post_id']}"})
+            elif r["connected_platform_id"] not in owned_platforms:
+                errors.append({"row": row, "error": f"connected platform not found: {r['connected_platform_id']}"})
+            else:
+                rows.append(r)
+        errors.sort(key=lambda e: e["row"])
+        return rows
+
+async def _read_file(path: str, size: int = 1 << 16) -> AsyncIterator[bytes]:
+    with open(path, "rb") as f:
+        while True:
+            data = await asyncio.to_thread(f.read, size)
+            if not data:
+                return
+            yield data
+
+async def main(argv: Optional[List[str]] = None) -> int:
+    """
+    CLI: python -m src.services.import_service posts export.csv --user-id <uuid> [--job-id <uuid>]
+    """
+    parser = argparse.ArgumentParser(description="Bulk import posts or schedules")
+    parser.add_argument("kind", choices=IMPORT_KINDS)
+    parser.add_argument("path")
+    parser.add_argument("--user-id", required=True)
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="defaults to the file extension")
+    parser.add_argument("--job-id", help="resume this import job")
+    args = parser.parse_args(argv)
+    fmt = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+
+    await init_db()
+    async with get_session(primary=True) as session:
+        svc = ImportService(session)
+        job = await svc.start_job(args.user_id, args.kind, fmt, job_id=args.job_id)
+        print(f"import job {job.id}")
+        job = await svc.run(job, _read_file(args.path))
+        print(json.dumps({
+            "job_id": str(job.id),
+            "status": job.status,
+            "rows_processed": job.rows_processed,
+            "rows_imported": job.rows_imported,
+            "rows_failed": job.rows_failed,
+            "last_error": job.last_error,
+        }))
+        return 0 if job.status == "completed" else 1
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))
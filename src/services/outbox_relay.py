@@ -0,0 +1,176 @@
+# src/services/outbox_relay.py
+import asyncio
+import os
+import signal
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+import structlog
+from sqlalchemy import update
+from sqlmodel import select
+
+from src.infrastructure import metrics
+from src.infrastructure.database import claim_rows, get_session, init_db, reclaim_rows
+from src.infrastructure.telegram_bot_client import TelegramBotClient, TelegramBotError
+from src.infrastructure.worker import PollingWorker
+from src.models.post import Post, PublishJob
+
+logger = structlog.get_logger(__name__)
+
+OUTBOX_RELAY_ENABLED = os.getenv("OUTBOX_RELAY_ENABLED", "true").lower() == "true"
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_CONCURRENCY = int(os.getenv("OUTBOX_CONCURRENCY", "10"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "1"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+OUTBOX_RETRY_BACKOFF_SECONDS = int(os.getenv("OUTBOX_RETRY_BACKOFF_SECONDS", "10"))
+# a job still "running" this long after its claim (updated_at) belonged to a dead worker and is reclaimed
+OUTBOX_LEASE_SECONDS = int(os.getenv("OUTBOX_LEASE_SECONDS", "1800"))
+OUTBOX_RECLAIM_INTERVAL = float(os.getenv("OUTBOX_RECLAIM_INTERVAL", "60"))
+
+class OutboxRelay(PollingWorker):
+    """
+    Drains pending `PublishJob` rows: publishes each post to Telegram and records the
+    outcome on the job and the post (draft=False once published). Jobs left "running"
+    past `lease_seconds` (the worker died before writing back) are handed back as a retry,
+    or failed once attempts are used up.
+    """
+
+    name = "outbox_relay"
+
+    def __init__(
+        self,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        concurrency: int = OUTBOX_CONCURRENCY,
+        poll_interval: float = OUTBOX_POLL_INTERVAL,
+        max_attempts: int = OUTBOX_MAX_ATTEMPTS,
+        retry_backoff_seconds: int = OUTBOX_RETRY_BACKOFF_SECONDS,
+        lease_seconds: int = OUTBOX_LEASE_SECONDS,
+        reclaim_interval: float = OUTBOX_RECLAIM_INTERVAL,
+    ):
+        super().__init__(batch_size=batch_size, poll_interval=poll_interval)
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.lease_seconds = lease_seconds
+        self.reclaim_interval = reclaim_interval
+        self._next_reclaim = 0.0
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._telegram: Optional[TelegramBotClient] = None
+        self.stats = {"claimed": 0, "published": 0, "failed": 0, "retried": 0, "reclaimed": 0}
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "running": self.running}
+
+    async def _publish_one(self, post: Post) -> Tuple[Optional[str], Optional[str]]:
+        async with self._semaphore:
+            try:
+                if self._telegram is None:
+                    self._telegram = TelegramBotClient()
+                body = await self._telegram.publish_post(title=post.title, content=post.content, media_path=post.media_path)
+                message_id = (body.get("result") or {}).get("message_id")
+                return (str(message_id) if message_id is not None else None), None
+            except TelegramBotError as e:
+                return None, str(e)
+            except Exception as e:
+                logger.exception("outbox_publish_unexpected_error", post_id=str(post.id), error=str(e))
+                return None, str(e) or e.__class__.__name__
+
+    def _job_update(self, job: PublishJob, external_id: Optional[str], error: Optional[str], now: datetime) -> dict:
+        attempts = job.attempts + 1
+        if error is None:
+            self.stats["published"] += 1
+            return {"id": job.id, "status": "published", "attempts": attempts, "external_post_id": external_id, "last_error": None, "updated_at": now}
+        if attempts < self.max_attempts:
+            self.stats["retried"] += 1
+            return {
+                "id": job.id,
+                "status": "pending",
+                "attempts": attempts,
+                "last_error": error,
+                "available_at": now + timedelta(seconds=self.retry_backoff_seconds * 2 ** job.attempts),
+                "updated_at": now,
+            }
+        self.stats["failed"] += 1
+        return {"id": job.id, "status": "failed", "attempts": attempts, "last_error": error, "updated_at": now}
+
+    async def reclaim_expired(self, now: datetime) -> int:
+        """
+        Hand back jobs whose claim lease ran out; each reclaim counts as an attempt.
+        """
+        expired = (
+            PublishJob.status == "running",
+            PublishJob.updated_at < now - timedelta(seconds=self.lease_seconds),
+        )
+        error = "claim lease expired before the result was written back"
+        async with get_session(primary=True) as session:
+            retried = await reclaim_rows(
+                session,
+                PublishJob,
+                *expired,
+                PublishJob.attempts + 1 < self.max_attempts,
+                values={"status": "pending", "attempts": PublishJob.attempts + 1, "last_error": error, "available_at": now, "updated_at": now},
+            )
+            failed = await reclaim_rows(
+                session,
+                PublishJob,
+                *expired,
+                values={"status": "failed", "attempts": PublishJob.attempts + 1, "last_error": error, "updated_at": now},
+            )
+        if retried or failed:
+            self.stats["reclaimed"] += retried + failed
+            self.stats["retried"] += retried
+            self.stats["failed"] += failed
+            logger.warning("outbox_reclaimed_expired", retried=retried, failed=failed, lease_seconds=self.lease_seconds)
+        return retried + failed
+
+    async def run_once(self) -> int:
+        now = datetime.utcnow()
+        if time.monotonic() >= self._next_reclaim:
+            self._next_reclaim = time.monotonic() + self.reclaim_interval
+            await self.reclaim_expired(now)
+        async with get_session(primary=True) as session:
+            ids = await claim_rows(
+                session,
+                PublishJob,
+                PublishJob.status == "pending",
+                PublishJob.available_at <= now,
+                values={"status": "running", "updated_at": now},
+                order_by=(PublishJob.available_at,),
+                limit=self.batch_size,
+            )
+            if not ids:
+                return 0
+            q = select(PublishJob, Post).join(Post, Post.id == PublishJob.post_id).where(PublishJob.id.in_(ids))
+            rows = (await session.execute(q)).all()
+
+        results = await asyncio.gather(*(self._publish_one(post) for _, post in rows))
+
+        now = datetime.utcnow()
+        job_updates = [self._job_update(job, ext, err, now) for (job, _), (ext, err) in zip(rows, results)]
+        published_posts = [{"id": post.id, "draft": False} for (_, post), (_, err) in zip(rows, results) if err is None]
+
+        async with get_session(primary=True) as session:
+            await session.execute(update(PublishJob), job_updates)
+            if published_posts:
+                await session.execute(update(Post), published_posts)
+            await session.commit()
+
+        self.stats["claimed"] += len(ids)
+        logger.info("outbox_batch_done", claimed=len(ids), published=len(published_posts))
+        return len(ids)
+
+outbox_relay = OutboxRelay()
+metrics.register("outbox_relay", outbox_relay.snapshot)
+
+async def main():
+    """
+    Standalone worker entry point: python -m src.services.outbox_relay
+    """
+    await init_db()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, outbox_relay.request_stop)
+    await outbox_relay.run_forever()
+
+if __name__ == "__main__":
+    asyncio.run(main())
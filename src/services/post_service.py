@@ -1,14 +1,60 @@
 # src/services/post_service.py
+import asyncio
+import base64
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import List, Optional, Tuple
+import httpx
+import structlog
+from sqlalchemy import insert, tuple_, update
 from sqlmodel.ext.asyncio.session import AsyncSession
-from src.models.post import Post, Schedule
+from src.models.post import Post, Schedule, PublishJob
 from src.models.connected_platform import ConnectedPlatform
-from src.infrastructure.telegram_bot_client import TelegramBotClient
+from src.infrastructure.database import commit_or_flush
+from src.infrastructure.media_variants import media_variants
+from src.infrastructure.telegram_bot_client import TelegramBotClient, TelegramBotError
+from src.services.schedule_service import _naive_utc
+from src.UAA.credentials import credential_cache
 from sqlmodel import select
 
+logger = structlog.get_logger(__name__)
+
+# "outbox": commit post + publish job and return at once; "sync": publish before committing
+POST_PUBLISH_MODE = os.getenv("POST_PUBLISH_MODE", "outbox").lower()
+MAX_BULK_POSTS = int(os.getenv("MAX_BULK_POSTS", "500"))
+BULK_PUBLISH_CONCURRENCY = int(os.getenv("BULK_PUBLISH_CONCURRENCY", "10"))
+MAX_SCHEDULE_BATCH = int(os.getenv("MAX_SCHEDULE_BATCH", "1000"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "100"))
+
+class ScheduleBatchTooLarge(ValueError):
+    pass
+
+def encode_cursor(created_at: datetime, post_id: uuid.UUID) -> str:
+    raw = json.dumps([created_at.isoformat(), str(post_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, post_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), uuid.UUID(post_id)
+    except Exception:
+        raise ValueError("invalid cursor")
+
 class PostService:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, http_client: Optional[httpx.AsyncClient] = None):
         self.session = session
-        self.telegram_client = TelegramBotClient()
+        self.http_client = http_client
+        self._telegram_client: Optional[TelegramBotClient] = None
+
+    @property
+    def telegram_client(self) -> TelegramBotClient:
+        # built on first use so outbox-mode requests don't require Telegram config
+        if self._telegram_client is None:
+            self._telegram_client = TelegramBotClient(http_client=self.http_client)
+        return self._telegram_client
 
     async def create_post(self, user_id: str, payload):
         post = Post(user_id=user_id, title=payload.title, content=payload.content, media_path=payload.media_path, draft=False)
@@ -20,10 +66,202 @@ class PostService:
             media_path=post.media_path,
         )
 
-        await self.session.commit()
-        await self.session.refresh(post)
+        await commit_or_flush(self.session)
         return post
 
+    async def enqueue_post(self, user_id: str, payload) -> dict:
+        """
+        Outbox mode: persist the post (as draft until published) and its publish job
+        in a single transaction. The outbox relay publishes it in the background.
+        """
+        post = Post(user_id=user_id, title=payload.title, content=payload.content, media_path=payload.media_path, draft=True)
+        job = PublishJob(post_id=post.id)
+        accepted = {"job_id": job.id, "post_id": post.id, "status": job.status}
+        self.session.add(post)
+        self.session.add(job)
+        await commit_or_flush(self.session)
+        return accepted
+
+    async def create_posts_bulk(self, user_id: str, payloads: List, sync: bool = False) -> List[dict]:
+        """
+        Insert many posts with one multi-row INSERT and return one result per item, in order.
+        Outbox mode inserts the publish jobs in the same transaction. Sync mode commits the
+        posts as drafts first, publishes them with bounded concurrency, then flips the
+        published ones to draft=False in one UPDATE; failed items stay as drafts.
+        """
+        now = datetime.utcnow()
+        owner_id = uuid.UUID(str(user_id))
+        results: List[dict] = []
+        post_rows = []
+        for index, payload in enumerate(payloads):
+            if not (payload.title or payload.content or payload.media_path):
+                results.append({"index": index, "status": "failed", "error": "Post content is empty"})
+                continue
+            row = {
+                "id": uuid.uuid4(),
+                "user_id": owner_id,
+                "title": payload.title,
+                "content": payload.content,
+                "media_path": payload.media_path,
+                "draft": True,
+                "created_at": now,
+            }
+            post_rows.append(row)
+            results.append({"index": index, "status": "queued", "post_id": row["id"]})
+        if not post_rows:
+            return results
+
+        await self.session.execute(insert(Post).values(post_rows))
+        if not sync:
+            job_rows = [
+                {"id": uuid.uuid4(), "post_id": row["id"], "status": "pending", "attempts": 0,
+                 "available_at": now, "created_at": now, "updated_at": now}
+                for row in post_rows
+            ]
+            await self.session.execute(insert(PublishJob).values(job_rows))
+            await self.session.commit()
+            job_ids = {row["post_id"]: row["id"] for row in job_rows}
+            for result in results:
+                if result.get("post_id"):
+                    result["job_id"] = job_ids[result["post_id"]]
+            return results
+
+        # commit before publishing so no connection is held while Telegram answers
+        await self.session.commit()
+        semaphore = asyncio.Semaphore(BULK_PUBLISH_CONCURRENCY)
+
+        async def publish(row: dict) -> Optional[str]:
+            async with semaphore:
+                try:
+                    await self.telegram_client.publish_post(title=row["title"], content=row["content"], media_path=row["media_path"])
+                    return None
+                except TelegramBotError as e:
+                    return str(e)
+                except Exception as e:
+                    # timeouts, connection errors, missing media: fail this item, not the batch
+                    logger.exception("bulk_publish_unexpected_error", post_id=str(row["id"]), error=str(e))
+                    return str(e) or e.__class__.__name__
+
+        errors = await asyncio.gather(*(publish(row) for row in post_rows))
+        by_post = {row["id"]: error for row, error in zip(post_rows, errors)}
+        published = [post_id for post_id, error in by_post.items() if error is None]
+        if published:
+            await self.session.execute(update(Post).where(Post.id.in_(published)).values(draft=False))
+            await self.session.commit()
+        for result in results:
+            post_id = result.get("post_id")
+            if post_id is None:
+                continue
+            if by_post[post_id] is None:
+                result["status"] = "published"
+            else:
+                result["status"] = "failed"
+                result["error"] = by_post[post_id]
+        return results
+
+    async def list_posts(self, user_id: str, limit: int = 20, cursor: Optional[str] = None, draft: Optional[bool] = None) -> Tuple[List[Post], Optional[str]]:
+        """
+        One page of the user's posts, newest first, and the cursor of the next page.
+        Keyset pagination on (created_at, id): every page is a single range scan of
+        ix_post_user_created_id however deep it is, unlike OFFSET.
+        """
+        owner_id = uuid.UUID(str(user_id))
+        q = select(Post).where(Post.user_id == owner_id)
+        if draft is not None:
+            q = q.where(Post.draft == draft)
+        if cursor:
+            created_at, post_id = decode_cursor(cursor)
+            q = q.where(tuple_(Post.created_at, Post.id) < tuple_(created_at, post_id))
+        q = q.order_by(Post.created_at.desc(), Post.id.desc()).limit(limit + 1)
+        res = await self.session.execute(q)
+        posts = list(res.scalars().all())
+        next_cursor = None
+        if len(posts) > limit:
+            posts = posts[:limit]
+            next_cursor = encode_cursor(posts[-1].created_at, posts[-1].id)
+        return posts, next_cursor
+
+    async def fan_out_telegram(self, user_id: str, post_id: str, connected_platform_ids: Optional[List[uuid.UUID]] = None) -> List[dict]:
+        """
+        Publish a post now to many of the user's connected Telegram chats. Targets sharing a
+        bot go through one client's bounded fan-out; each chat gets a Schedule row recording
+        its message_id (external_post_id) or its error, all written with one INSERT.
+        """
+        owner_id = uuid.UUID(str(user_id))
+        q = select(Post).where(Post.id == post_id, Post.user_id == owner_id)
+        post = (await self.session.execute(q)).scalar_one_or_none()
+        if not post:
+            raise LookupError("post not found")
+
+        q2 = select(ConnectedPlatform).where(ConnectedPlatform.user_id == owner_id, ConnectedPlatform.provider == "telegram")
+        if connected_platform_ids is not None:
+            wanted = list(dict.fromkeys(connected_platform_ids))
+            q2 = q2.where(ConnectedPlatform.id.in_(wanted))
+        targets = list((await self.session.execute(q2)).scalars().all())
+        if connected_platform_ids is not None:
+            found = {cp.id for cp in targets}
+            missing = [str(cp_id) for cp_id in wanted if cp_id not in found]
+            if missing:
+                raise LookupError(f"telegram platform not found: {', '.join(missing)}")
+        if not targets:
+            raise LookupError("no connected telegram chats")
+        # release the connection while Telegram answers
+        await self.session.commit()
+
+        # outcomes are per connected platform: two bots may post to the same chat
+        outcomes: dict = {}
+        by_bot: dict = {}
+        for cp in targets:
+            bot_token = credential_cache.access_token(cp)
+            if not cp.provider_user_id:
+                outcomes[cp.id] = (None, "connected platform has no chat id")
+            elif not bot_token:
+                # never fall back to the shared TELEGRAM_BOT_TOKEN bot
+                outcomes[cp.id] = (None, "bot token unavailable")
+            else:
+                by_bot.setdefault(bot_token, []).append(cp)
+
+        async def send_group(bot_token: str, cps: List[ConnectedPlatform]) -> dict:
+            chat_ids = list(dict.fromkeys(cp.provider_user_id for cp in cps))
+            try:
+                client = TelegramBotClient(bot_token=bot_token, http_client=self.http_client)
+                sent = await client.publish_to_chats(post.title, post.content, post.media_path, chat_ids)
+            except TelegramBotError as e:
+                sent = {chat_id: (None, str(e)) for chat_id in chat_ids}
+            return {cp.id: sent[cp.provider_user_id] for cp in cps}
+
+        for group in await asyncio.gather(*(send_group(token, cps) for token, cps in by_bot.items())):
+            outcomes.update(group)
+
+        now = datetime.utcnow()
+        rows, results = [], []
+        for cp in targets:
+            message_id, error = outcomes[cp.id]
+            row = {
+                "id": uuid.uuid4(), "post_id": post.id, "connected_platform_id": cp.id, "scheduled_time": now,
+                "status": "failed" if error else "published", "external_post_id": message_id, "last_error": error,
+                "retry_count": 0, "meta": {}, "created_at": now,
+            }
+            rows.append(row)
+            results.append({
+                "connected_platform_id": cp.id, "chat_id": cp.provider_user_id, "schedule_id": row["id"],
+                "status": row["status"], "message_id": message_id, "error": error,
+            })
+        await self.session.execute(insert(Schedule).values(rows))
+        if any(r["status"] == "published" for r in results):
+            await self.session.execute(update(Post).where(Post.id == post.id).values(draft=False))
+        await self.session.commit()
+        return results
+
+    async def get_publish_job(self, user_id: str, job_id: uuid.UUID) -> Optional[PublishJob]:
+        q = (
+            select(PublishJob)
+            .join(Post, Post.id == PublishJob.post_id)
+            .where(PublishJob.id == job_id, Post.user_id == user_id)
+        )
+        res = await self.session.execute(q)
+        return res.scalar_one_or_none()
+
     async def schedule_post(self, post_id: str, payload):
         # validate post exists
         q = select(Post).where(Post.id == post_id)
@@ -39,8 +277,58 @@ class PostService:
         if not cp:
             raise ValueError("connected platform not found")
 
-        sched = Schedule(post_id=post.id, connected_platform_id=cp.id, scheduled_time=payload.scheduled_time)
+        sched = Schedule(post_id=post.id, connected_platform_id=cp.id, scheduled_time=_naive_utc(payload.scheduled_time))
         self.session.add(sched)
-        await self.session.commit()
-        await self.session.refresh(sched)
+        await commit_or_flush(self.session)
+        # render the platform's media variants now so they are ready at publish time
+        media_variants.prefetch(post.media_path, cp.provider)
         return sched
+
+    async def schedule_post_batch(self, user_id: str, post_id: str, payload) -> List[dict]:
+        """
+        Schedule one post on many connected platforms at many times in one call.
+        Ownership of the post and of every platform is checked up front (one IN query
+        for the platforms) and all Schedule rows are written with one INSERT.
+        """
+        owner_id = uuid.UUID(str(user_id))
+        platform_ids = list(dict.fromkeys(payload.connected_platform_ids))
+        # scheduled_time is naive UTC; normalizing first also dedupes "…Z" against its naive twin
+        times = list(dict.fromkeys(_naive_utc(when) for when in payload.scheduled_times))
+        if not platform_ids or not times:
+            raise ValueError("at least one connected platform and one scheduled time are required")
+        if len(platform_ids) * len(times) > MAX_SCHEDULE_BATCH:
+            raise ScheduleBatchTooLarge(f"at most {MAX_SCHEDULE_BATCH} schedules per request")
+
+        q = select(Post.id, Post.media_path).where(Post.id == post_id, Post.user_id == owner_id)
+        res = await self.session.execute(q)
+        found = res.first()
+        if not found:
+            raise LookupError("post not found")
+        post_uuid, media_path = found
+
+        q2 = select(ConnectedPlatform.id, ConnectedPlatform.provider).where(
+            ConnectedPlatform.id.in_(platform_ids),
+            ConnectedPlatform.user_id == owner_id,
+        )
+        res2 = await self.session.execute(q2)
+        providers = dict(res2.all())
+        owned = set(providers)
+        missing = [str(cp_id) for cp_id in platform_ids if cp_id not in owned]
+        if missing:
+            raise LookupError(f"connected platform not found: {', '.join(missing)}")
+
+        now = datetime.utcnow()
+        rows = [
+            {"id": uuid.uuid4(), "post_id": post_uuid, "connected_platform_id": cp_id, "scheduled_time": when,
+             "status": "pending", "retry_count": 0, "meta": {}, "created_at": now}
+            for cp_id in platform_ids
+            for when in times
+        ]
+        await self.session.execute(insert(Schedule).values(rows))
+        await self.session.commit()
+        for provider in set(providers.values()):
+            media_variants.prefetch(media_path, provider)
+        return [
+            {"schedule_id": row["id"], "connected_platform_id": row["connected_platform_id"], "scheduled_time": row["scheduled_time"]}
+            for row in rows
+        ]
@@ -0,0 +1,251 @@
+# src/services/publish_dispatcher.py
+import asyncio
+import os
+import signal
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+import structlog
+from sqlalchemy import or_, update
+from sqlmodel import select
+
+from src.infrastructure import metrics
+from src.infrastructure.database import claim_rows, get_session, init_db, reclaim_rows
+from src.infrastructure.telegram_bot_client import TelegramBotClient, TelegramBotError
+from src.infrastructure.worker import PollingWorker
+from src.models.connected_platform import ConnectedPlatform
+from src.models.post import Post, Schedule
+from src.UAA.credentials import credential_cache, credential_rotator
+
+logger = structlog.get_logger(__name__)
+
+DISPATCHER_ENABLED = os.getenv("DISPATCHER_ENABLED", "false").lower() == "true"
+DISPATCH_BATCH_SIZE = int(os.getenv("DISPATCH_BATCH_SIZE", "100"))
+DISPATCH_CONCURRENCY = int(os.getenv("DISPATCH_CONCURRENCY", "20"))
+DISPATCH_POLL_INTERVAL = float(os.getenv("DISPATCH_POLL_INTERVAL", "2"))
+DISPATCH_MAX_RETRIES = int(os.getenv("DISPATCH_MAX_RETRIES", "3"))
+DISPATCH_RETRY_BACKOFF_SECONDS = int(os.getenv("DISPATCH_RETRY_BACKOFF_SECONDS", "60"))
+# a schedule still "running" this long after its claim belonged to a dead worker and is reclaimed;
+# keep it well above the slowest batch (uploads, rate-limit waits) or live rows get published twice
+DISPATCH_LEASE_SECONDS = int(os.getenv("DISPATCH_LEASE_SECONDS", "1800"))
+DISPATCH_RECLAIM_INTERVAL = float(os.getenv("DISPATCH_RECLAIM_INTERVAL", "60"))
+
+# (schedule, post, connected platform) -> external post id
+Publisher = Callable[[Schedule, Post, ConnectedPlatform], Awaitable[Optional[str]]]
+
+class UnsupportedProviderError(Exception):
+    pass
+
+class PlatformPublisher:
+    """
+    Default publisher: routes a schedule to the client for its platform's provider.
+    Clients are created lazily so a missing provider config only fails its own schedules.
+    """
+
+    def __init__(self):
+        # one client per bot token
+        self._telegram: Dict[str, TelegramBotClient] = {}
+
+    async def __call__(self, schedule: Schedule, post: Post, cp: ConnectedPlatform) -> Optional[str]:
+        if cp.provider == "telegram":
+            # a connected chat carries its chat id and (encrypted) bot token. Never fall back
+            # to TELEGRAM_BOT_TOKEN / TELEGRAM_CHAT_ID: that would post as the shared bot
+            bot_token = credential_cache.access_token(cp)
+            if not bot_token:
+                raise TelegramBotError("bot token unavailable")
+            if not cp.provider_user_id:
+                raise TelegramBotError("connected platform has no chat id")
+            client = self._telegram.get(bot_token)
+            if client is None:
+                client = self._telegram[bot_token] = TelegramBotClient(bot_token=bot_token)
+            body = await client.publish_post(title=post.title, content=post.content, media_path=post.media_path, chat_id=cp.provider_user_id)
+            message_id = (body.get("result") or {}).get("message_id")
+            return str(message_id) if message_id is not None else None
+        raise UnsupportedProviderError(f"publishing to provider '{cp.provider}' is not supported")
+
+class PublishDispatcher(PollingWorker):
+    """
+    Claims due `Schedule` rows in batches, publishes them through a bounded pool of
+    concurrent tasks and writes the resulting status transitions back in bulk.
+    Safe to run in several processes at once: claiming uses FOR UPDATE SKIP LOCKED.
+    Claims carry a lease: rows left "running" past `lease_seconds` (the worker died before
+    writing back) are handed back as a retry, or failed once retries are used up.
+    """
+
+    name = "dispatcher"
+
+    def __init__(
+        self,
+        publisher: Optional[Publisher] = None,
+        batch_size: int = DISPATCH_BATCH_SIZE,
+        concurrency: int = DISPATCH_CONCURRENCY,
+        poll_interval: float = DISPATCH_POLL_INTERVAL,
+        max_retries: int = DISPATCH_MAX_RETRIES,
+        retry_backoff_seconds: int = DISPATCH_RETRY_BACKOFF_SECONDS,
+        lease_seconds: int = DISPATCH_LEASE_SECONDS,
+        reclaim_interval: float = DISPATCH_RECLAIM_INTERVAL,
+    ):
+        super().__init__(batch_size=batch_size, poll_interval=poll_interval)
+        self.publisher = publisher or PlatformPublisher()
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.lease_seconds = lease_seconds
+        self.reclaim_interval = reclaim_interval
+        self._next_reclaim = 0.0
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.stats = {"batches": 0, "claimed": 0, "published": 0, "failed": 0, "retried": 0, "reclaimed": 0, "busy_seconds": 0.0}
+
+    def snapshot(self) -> dict:
+        busy = self.stats["busy_seconds"]
+        return {
+            **self.stats,
+            "published_per_second": round(self.stats["published"] / busy, 2) if busy else 0.0,
+            "batch_size": self.batch_size,
+            "concurrency": self.concurrency,
+            "poll_interval": self.poll_interval,
+            "running": self.running,
+        }
+
+    async def _publish_one(self, schedule: Schedule, post: Post, cp: ConnectedPlatform) -> Tuple[Optional[str], Optional[str]]:
+        async with self._semaphore:
+            try:
+                return await self.publisher(schedule, post, cp), None
+            except (TelegramBotError, UnsupportedProviderError) as e:
+                return None, str(e)
+            except Exception as e:
+                logger.exception("dispatch_publish_unexpected_error", schedule_id=str(schedule.id), error=str(e))
+                return None, str(e) or e.__class__.__name__
+
+    def _failure_update(self, schedule: Schedule, error: str, now: datetime) -> dict:
+        attempts = schedule.retry_count + 1
+        if attempts <= self.max_retries:
+            self.stats["retried"] += 1
+            return {
+                "id": schedule.id,
+                "status": "pending",
+                "retry_count": attempts,
+                "last_error": error,
+                "scheduled_time": now + timedelta(seconds=self.retry_backoff_seconds * 2 ** schedule.retry_count),
+            }
+        self.stats["failed"] += 1
+        return {"id": schedule.id, "status": "failed", "retry_count": attempts, "last_error": error}
+
+    async def reclaim_expired(self, now: datetime) -> int:
+        """
+        Hand back schedules whose claim lease ran out. Each reclaim counts as a failed
+        attempt, so a row that keeps killing its worker ends up failed instead of looping.
+        Rows claimed before claimed_at existed have none and are treated as expired.
+        """
+        expired = (
+            Schedule.status == "running",
+            or_(Schedule.claimed_at.is_(None), Schedule.claimed_at < now - timedelta(seconds=self.lease_seconds)),
+        )
+        error = "claim lease expired before the result was written back"
+        async with get_session(primary=True) as session:
+            retried = await reclaim_rows(
+                session,
+                Schedule,
+                *expired,
+                Schedule.retry_count < self.max_retries,
+                values={"status": "pending", "retry_count": Schedule.retry_count + 1, "last_error": error, "claimed_at": None},
+            )
+            failed = await reclaim_rows(
+                session,
+                Schedule,
+                *expired,
+                values={"status": "failed", "retry_count": Schedule.retry_count + 1, "last_error": error},
+            )
+        if retried or failed:
+            self.stats["reclaimed"] += retried + failed
+            self.stats["retried"] += retried
+            self.stats["failed"] += failed
+            logger.warning("dispatch_reclaimed_expired", retried=retried, failed=failed, lease_seconds=self.lease_seconds)
+        return retried + failed
+
+    async def run_once(self) -> int:
+        """
+        Claim and publish a single batch. Returns the number of claimed schedules.
+        """
+        started = time.monotonic()
+        now = datetime.utcnow()
+        if started >= self._next_reclaim:
+            self._next_reclaim = started + self.reclaim_interval
+            await self.reclaim_expired(now)
+        async with get_session(primary=True) as session:
+            ids = await claim_rows(
+                session,
+                Schedule,
+                Schedule.status == "pending",
+                Schedule.scheduled_time <= now,
+                values={"status": "running", "claimed_at": now},
+                order_by=(Schedule.scheduled_time,),
+                limit=self.batch_size,
+            )
+            if not ids:
+                return 0
+            q = (
+                select(Schedule, Post, ConnectedPlatform)
+                .join(Post, Post.id == Schedule.post_id)
+                .join(ConnectedPlatform, ConnectedPlatform.id == Schedule.connected_platform_id)
+                .where(Schedule.id.in_(ids))
+            )
+            rows = (await session.execute(q)).all()
+        # decrypt each platform's credentials once per batch instead of once per schedule
+        credential_cache.warm(cp for _, _, cp in rows)
+
+        results = await asyncio.gather(*(self._publish_one(s, p, cp) for s, p, cp in rows))
+
+        now = datetime.utcnow()
+        updates = []
+        published = 0
+        for (schedule, _, _), (external_id, error) in zip(rows, results):
+            if error is None:
+                published += 1
+                updates.append({"id": schedule.id, "status": "published", "external_post_id": external_id, "last_error": None})
+            else:
+                updates.append(self._failure_update(schedule, error, now))
+        found = {schedule.id for schedule, _, _ in rows}
+        for missing in set(ids) - found:
+            self.stats["failed"] += 1
+            updates.append({"id": missing, "status": "failed", "last_error": "post or connected platform not found"})
+
+        async with get_session(primary=True) as session:
+            await session.execute(update(Schedule), updates)
+            await session.commit()
+
+        elapsed = time.monotonic() - started
+        self.stats["batches"] += 1
+        self.stats["claimed"] += len(ids)
+        self.stats["published"] += published
+        self.stats["busy_seconds"] += elapsed
+        logger.info(
+            "dispatch_batch_done",
+            claimed=len(ids),
+            published=published,
+            failed=len(ids) - published,
+            duration_ms=int(elapsed * 1000),
+            published_per_second=round(published / elapsed, 2) if elapsed else None,
+        )
+        return len(ids)
+
+dispatcher = PublishDispatcher()
+metrics.register("dispatcher", dispatcher.snapshot)
+
+async def main():
+    """
+    Standalone worker entry point: python -m src.services.publish_dispatcher
+    """
+    await init_db()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, dispatcher.request_stop)
+    credential_rotator.start()
+    try:
+        await dispatcher.run_forever()
+    finally:
+        await credential_rotator.stop()
+
+if __name__ == "__main__":
+    asyncio.run(main())
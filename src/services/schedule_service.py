@@ -0,0 +1,105 @@
+# src/services/schedule_service.py
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.models.connected_platform import ConnectedPlatform
+from src.models.post import Post, Schedule
+
+MAX_SCHEDULE_RANGE_DAYS = int(os.getenv("MAX_SCHEDULE_RANGE_DAYS", "93"))
+MAX_SCHEDULE_ITEMS = int(os.getenv("MAX_SCHEDULE_ITEMS", "1000"))
+
+def _naive_utc(value: datetime) -> datetime:
+    # scheduled_time is stored as naive UTC; an offset or "Z" in the query would not bind against it
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+class ScheduleService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @staticmethod
+    def _check_range(start: datetime, end: datetime) -> Tuple[datetime, datetime]:
+        """
+        Validate [start, end) and return it as naive UTC.
+        """
+        start, end = _naive_utc(start), _naive_utc(end)
+        if end <= start:
+            raise ValueError("'to' must be after 'from'")
+        if end - start > timedelta(days=MAX_SCHEDULE_RANGE_DAYS):
+            raise ValueError(f"range is limited to {MAX_SCHEDULE_RANGE_DAYS} days")
+        return start, end
+
+    def _base_filters(self, user_id: str, start: datetime, end: datetime, status: Optional[str]) -> list:
+        filters = [
+            Post.user_id == uuid.UUID(str(user_id)),
+            Schedule.scheduled_time >= start,
+            Schedule.scheduled_time < end,
+        ]
+        if status:
+            filters.append(Schedule.status == status)
+        return filters
+
+    async def list_range(self, user_id: str, start: datetime, end: datetime, status: Optional[str] = None, limit: int = MAX_SCHEDULE_ITEMS) -> List[dict]:
+        """
+        The user's schedules with scheduled_time in [start, end), ordered by time,
+        with their post and platform joined in the same query.
+        """
+        start, end = self._check_range(start, end)
+        q = (
+            select(
+                Schedule.id,
+                Schedule.scheduled_time,
+                Schedule.status,
+                Schedule.external_post_id,
+                Post.id,
+                Post.title,
+                ConnectedPlatform.id,
+                ConnectedPlatform.provider,
+            )
+            .join(Post, Post.id == Schedule.post_id)
+            .join(ConnectedPlatform, ConnectedPlatform.id == Schedule.connected_platform_id)
+            .where(*self._base_filters(user_id, start, end, status))
+            .order_by(Schedule.scheduled_time, Schedule.id)
+            .limit(limit)
+        )
+        res = await self.session.execute(q)
+        return [
+            {
+                "schedule_id": schedule_id,
+                "scheduled_time": scheduled_time,
+                "status": sched_status,
+                "external_post_id": external_post_id,
+                "post_id": post_id,
+                "post_title": title,
+                "connected_platform_id": cp_id,
+                "provider": provider,
+            }
+            for schedule_id, scheduled_time, sched_status, external_post_id, post_id, title, cp_id, provider in res.all()
+        ]
+
+    async def count_per_day(self, user_id: str, start: datetime, end: datetime, status: Optional[str] = None) -> List[dict]:
+        """
+        Number of the user's schedules per (day, platform) in [start, end); days are UTC.
+        """
+        start, end = self._check_range(start, end)
+        day = func.date(Schedule.scheduled_time)
+        q = (
+            select(day, ConnectedPlatform.id, ConnectedPlatform.provider, func.count(Schedule.id))
+            .join(Post, Post.id == Schedule.post_id)
+            .join(ConnectedPlatform, ConnectedPlatform.id == Schedule.connected_platform_id)
+            .where(*self._base_filters(user_id, start, end, status))
+            .group_by(day, ConnectedPlatform.id, ConnectedPlatform.provider)
+            .order_by(day, ConnectedPlatform.provider)
+        )
+        res = await self.session.execute(q)
+        return [
+            {"day": d, "connected_platform_id": cp_id, "provider": provider, "count": count}
+            for d, cp_id, provider, count in res.all()
+        ]
@@ -0,0 +1,227 @@
+# src/services/token_refresher.py
+import asyncio
+import os
+import random
+import signal
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import structlog
+from sqlmodel import select
+
+from src.infrastructure import metrics
+from src.infrastructure.database import get_session, init_db
+from src.infrastructure.http_clients import http_clients
+from src.infrastructure.platforms_repo import CachedPlatformsRepository
+from src.infrastructure.redis_cache import redis_client
+from src.infrastructure.worker import PollingWorker
+from src.models.connected_platform import ConnectedPlatform
+from src.UAA.credentials import credential_cache
+from src.UAA.utils import encrypt_token
+
+logger = structlog.get_logger(__name__)
+
+TOKEN_REFRESH_ENABLED = os.getenv("TOKEN_REFRESH_ENABLED", "true").lower() == "true"
+# refresh tokens that expire within this window
+TOKEN_REFRESH_WINDOW_SECONDS = int(os.getenv("TOKEN_REFRESH_WINDOW_SECONDS", str(7 * 24 * 3600)))
+TOKEN_REFRESH_BATCH_SIZE = int(os.getenv("TOKEN_REFRESH_BATCH_SIZE", "100"))
+TOKEN_REFRESH_CONCURRENCY = int(os.getenv("TOKEN_REFRESH_CONCURRENCY", "5"))
+TOKEN_REFRESH_INTERVAL = float(os.getenv("TOKEN_REFRESH_INTERVAL", "300"))
+# each refresh starts after a random delay of up to this many seconds
+TOKEN_REFRESH_JITTER_SECONDS = float(os.getenv("TOKEN_REFRESH_JITTER_SECONDS", "30"))
+# after a failed refresh, leave the platform alone this long (per worker)
+TOKEN_REFRESH_RETRY_SECONDS = float(os.getenv("TOKEN_REFRESH_RETRY_SECONDS", "3600"))
+
+INSTAGRAM_CLIENT_ID = os.getenv("INSTAGRAM_CLIENT_ID")
+INSTAGRAM_CLIENT_SECRET = os.getenv("INSTAGRAM_CLIENT_SECRET")
+INSTAGRAM_TOKEN_URL = os.getenv("INSTAGRAM_TOKEN_URL")
+INSTAGRAM_REFRESH_URL = os.getenv("INSTAGRAM_REFRESH_URL", "https://graph.instagram.com/refresh_access_token")
+
+# (access token, refresh token) -> provider token response
+TokenRefreshFn = Callable[[str, Optional[str]], Awaitable[dict]]
+
+async def refresh_instagram(access_token: str, refresh_token: Optional[str]) -> dict:
+    client = http_clients.get("instagram")
+    if refresh_token and INSTAGRAM_TOKEN_URL:
+        resp = await client.post(INSTAGRAM_TOKEN_URL, data={
+            "grant_type": "refresh_token",
+            "refresh_token": refresh_token,
+            "client_id": INSTAGRAM_CLIENT_ID,
+            "client_secret": INSTAGRAM_CLIENT_SECRET,
+        })
+    else:
+        # long-lived Instagram tokens are refreshed with themselves
+        resp = await client.get(INSTAGRAM_REFRESH_URL, params={"grant_type": "ig_refresh_token", "access_token": access_token})
+    resp.raise_for_status()
+    return resp.json()
+
+REFRESHERS: Dict[str, TokenRefreshFn] = {
+    "instagram": refresh_instagram,
+}
+
+class TokenRefresher(PollingWorker):
+    """
+    Refreshes provider tokens before they expire, off the publish path. Each pass is one
+    range scan on the token_expires_at index, refreshes up to `concurrency` tokens at a time
+    (each after a random jitter) and writes the new tokens with one batched UPDATE.
+    A Redis lock per platform, held until that UPDATE commits, keeps several workers from
+    refreshing the same token; the UPDATE itself skips rows changed since the scan.
+    """
+
+    name = "token_refresher"
+
+    def __init__(
+        self,
+        refreshers: Optional[Dict[str, TokenRefreshFn]] = None,
+        batch_size: int = TOKEN_REFRESH_BATCH_SIZE,
+        concurrency: int = TOKEN_REFRESH_CONCURRENCY,
+        poll_interval: float = TOKEN_REFRESH_INTERVAL,
+        window_seconds: int = TOKEN_REFRESH_WINDOW_SECONDS,
+        jitter_seconds: float = TOKEN_REFRESH_JITTER_SECONDS,
+        retry_seconds: float = TOKEN_REFRESH_RETRY_SECONDS,
+    ):
+        super().__init__(batch_size=batch_size, poll_interval=poll_interval)
+        self.refreshers = refreshers if refreshers is not None else REFRESHERS
+        self.window_seconds = window_seconds
+        self.jitter_seconds = jitter_seconds
+        self.retry_seconds = retry_seconds
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._backoff: Dict[object, float] = {}
+        self.stats = {"scanned": 0, "refreshed": 0, "failed": 0, "skipped_locked": 0, "skipped_stale": 0, "dropped": 0}
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "backing_off": len(self._backoff), "running": self.running}
+
+    def _backing_off(self) -> List[object]:
+        now = time.monotonic()
+        self._backoff = {cp_id: until for cp_id, until in self._backoff.items() if until > now}
+        return list(self._backoff)
+
+    async def _refresh_one(self, cp: ConnectedPlatform) -> Optional[Tuple[ConnectedPlatform, str, Optional[str], Optional[datetime]]]:
+        """
+        Refresh one token under its Redis lock. On success the lock is left held and the
+        caller releases it once the new token is committed; until then another worker
+        could still scan the stale row and refresh again with an already-rotated token.
+        """
+        lock_key = self._lock_key(cp)
+        # jitter before taking a slot, so sleeping never holds up the refreshes that are due
+        await asyncio.sleep(random.uniform(0, self.jitter_seconds))
+        async with self._semaphore:
+            if not await redis_client.set(lock_key, "1", nx=True, ex=300):
+                self.stats["skipped_locked"] += 1
+                return None
+            try:
+                # another worker may have refreshed this token and released the lock while we
+                # slept; calling the provider again would reuse an already-rotated refresh token
+                if await self._changed_since_scan(cp):
+                    self.stats["skipped_stale"] += 1
+                    await self._release([lock_key])
+                    return None
+
+                creds = credential_cache.get(cp)
+                if not creds.access_token:
+                    raise ValueError("stored access token cannot be decrypted")
+                data = await self.refreshers[cp.provider](creds.access_token, creds.refresh_token)
+                new_access = data.get("access_token")
+                if not new_access:
+                    raise ValueError("no access token in refresh response")
+                expires_in = data.get("expires_in")
+                expires_at = datetime.utcnow() + timedelta(seconds=int(expires_in)) if expires_in else None
+                # providers that don't rotate refresh tokens omit them: keep the current one
+                refresh_enc = encrypt_token(data["refresh_token"]) if data.get("refresh_token") else cp.refresh_token_enc
+                return cp, encrypt_token(new_access), refresh_enc, expires_at
+            except Exception as e:
+                self.stats["failed"] += 1
+                self._backoff[cp.id] = time.monotonic() + self.retry_seconds
+                detail = e.response.text if isinstance(e, httpx.HTTPStatusError) else str(e)
+                logger.warning("token_refresh_failed", connected_platform_id=str(cp.id), provider=cp.provider, expires_at=str(cp.token_expires_at), error=detail)
+                await self._release([lock_key])
+                return None
+
+    @staticmethod
+    async def _changed_since_scan(cp: ConnectedPlatform) -> bool:
+        q = select(ConnectedPlatform.updated_at, ConnectedPlatform.token_expires_at).where(ConnectedPlatform.id == cp.id)
+        async with get_session(primary=True) as session:
+            current = (await session.execute(q)).first()
+        return current is None or tuple(current) != (cp.updated_at, cp.token_expires_at)
+
+    @staticmethod
+    def _lock_key(cp: ConnectedPlatform) -> str:
+        return f"token_refresh:{cp.id}"
+
+    async def _release(self, lock_keys: List[str]) -> None:
+        if not lock_keys:
+            return
+        try:
+            await redis_client.delete(*lock_keys)
+        except Exception:
+            # the locks expire on their own
+            pass
+
+    async def run_once(self) -> int:
+        if not self.refreshers:
+            return 0
+        horizon = datetime.utcnow() + timedelta(seconds=self.window_seconds)
+        q = (
+            select(ConnectedPlatform)
+            .where(
+                ConnectedPlatform.token_expires_at.is_not(None),
+                ConnectedPlatform.token_expires_at <= horizon,
+                ConnectedPlatform.provider.in_(list(self.refreshers)),
+            )
+            .order_by(ConnectedPlatform.token_expires_at)
+            .limit(self.batch_size)
+        )
+        skip = self._backing_off()
+        if skip:
+            q = q.where(ConnectedPlatform.id.not_in(skip))
+        async with get_session(primary=True) as session:
+            due = list((await session.execute(q)).scalars().all())
+        if not due:
+            return 0
+        self.stats["scanned"] += len(due)
+
+        results = await asyncio.gather(*(self._refresh_one(cp) for cp in due))
+        updates = [r for r in results if r is not None]
+        written = []
+        if updates:
+            try:
+                async with get_session(primary=True) as session:
+                    written = await CachedPlatformsRepository(session).update_tokens_many(updates)
+            finally:
+                await self._release([self._lock_key(cp) for cp, *_ in updates])
+            self.stats["refreshed"] += len(written)
+            written_ids = set(written)
+            dropped = [cp for cp, *_ in updates if cp.id not in written_ids]
+            if dropped:
+                # the row changed between our re-check and the write: the provider's new
+                # (possibly rotated) token is lost, so make it visible
+                self.stats["dropped"] += len(dropped)
+                for cp in dropped:
+                    logger.warning("token_refresh_write_skipped", connected_platform_id=str(cp.id), provider=cp.provider, scanned_updated_at=str(cp.updated_at))
+        logger.info("token_refresh_batch_done", due=len(due), refreshed=len(written))
+        # rows that could not be refreshed stay in the window: only a fully refreshed
+        # batch means more work is waiting
+        return len(due) if len(written) == len(due) else 0
+
+token_refresher = TokenRefresher()
+metrics.register("token_refresher", token_refresher.snapshot)
+
+async def main():
+    """
+    Standalone worker entry point: python -m src.services.token_refresher
+    """
+    await init_db()
+    await http_clients.startup()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, token_refresher.request_stop)
+    try:
+        await token_refresher.run_forever()
+    finally:
+        await http_clients.shutdown()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+import fakeredis
+import httpx
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+
+from src.infrastructure import cache, database
+from src.infrastructure.cache import entity_cache
+from src.main import app  # registers every model with SQLModel.metadata
+from src.UAA import utils
+from src.UAA.models import User
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path, monkeypatch):
+    """
+    Point the session factory at a throwaway SQLite database with every table created.
+    `db["checkouts"]` counts the connections checked out of its pool.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    counter = {"engine": engine, "checkouts": 0}
+
+    @event.listens_for(engine.sync_engine.pool, "checkout")
+    def _checkout(dbapi_conn, conn_record, conn_proxy):
+        counter["checkouts"] += 1
+
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    monkeypatch.setattr(database, "engine", engine)
+    counter["checkouts"] = 0
+    yield counter
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def fake_redis(monkeypatch):
+    """
+    In-memory Redis behind the entity cache and the token store (revocation checks).
+    """
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(cache, "redis_client", redis)
+    monkeypatch.setattr(utils.token_store, "redis", redis)
+    entity_cache.local.clear()
+    yield redis
+    entity_cache.local.clear()
+    await redis.aclose()
+
+
+@pytest_asyncio.fixture
+async def user(db):
+    async with database.get_session() as session:
+        u = User(email="alice@example.com", username="alice", hashed_password="x")
+        session.add(u)
+        await session.commit()
+    db["checkouts"] = 0
+    return u
+
+
+@pytest_asyncio.fixture
+async def client(db, fake_redis, user):
+    """
+    The real app (routers, auth and session dependencies) without its startup hooks,
+    authenticated as `user`.
+    """
+    token = utils.create_access_token(str(user.id))["token"]
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://test",
+        headers={"Authorization": f"Bearer {token}"},
+    ) as c:
+        yield c
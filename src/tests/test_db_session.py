@@ -0,0 +1,36 @@
+import uuid
+
+import pytest
+from structlog.testing import capture_logs
+
+
+@pytest.mark.asyncio
+async def test_one_pool_checkout_per_request(client, db):
+    # auth (user lookup on the first request), the router and the service share one session
+    for _ in range(3):
+        resp = await client.get("/posts/")
+        assert resp.status_code == 200
+
+    assert db["checkouts"] == 3
+
+
+@pytest.mark.asyncio
+async def test_request_answered_from_caches_checks_out_nothing(client, db):
+    await client.get("/posts/")  # caches the user
+    db["checkouts"] = 0
+
+    # auth is served from the entity cache and the handler itself never queries
+    resp = await client.get("/metrics/")
+
+    assert resp.status_code == 403
+    assert db["checkouts"] == 0
+
+
+@pytest.mark.asyncio
+async def test_checkouts_logged_when_handler_raises(client, db):
+    with capture_logs() as logs:
+        resp = await client.get(f"/posts/jobs/{uuid.uuid4()}")
+
+    assert resp.status_code == 404
+    assert {"event": "db_session_closed", "checkouts": 1, "log_level": "debug"} in logs
+    assert db["checkouts"] == 1
@@ -0,0 +1,39 @@
+import io
+
+import pytest
+from PIL import Image
+
+from src.infrastructure.media_store import media_store
+from src.infrastructure.media_variants import VariantCache, media_variants
+
+
+@pytest.fixture
+def media_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(media_store, "root", str(tmp_path / "media"))
+    monkeypatch.setattr(media_variants, "cache", VariantCache(root=str(tmp_path / "variants")))
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_preview_is_a_cached_webp_rendition(client, media_root):
+    buf = io.BytesIO()
+    Image.new("RGB", (1600, 900), "red").save(buf, "PNG")
+    uploaded = (await client.post("/media/", content=buf.getvalue(), headers={"Content-Type": "image/png"})).json()
+
+    first = await client.get(f"/media/{uploaded['sha256']}/preview")
+    second = await client.get(f"/media/{uploaded['sha256']}/preview")
+
+    assert first.status_code == 200
+    assert first.headers["content-type"] == "image/webp"
+    with Image.open(io.BytesIO(first.content)) as img:
+        assert (img.format, img.size) == ("WEBP", (640, 360))
+    assert second.content == first.content
+    assert media_variants.cache.stats["hits"] == 1
+    await media_variants.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_preview_of_unknown_media_is_404(client, media_root):
+    resp = await client.get(f"/media/{'0' * 64}/preview")
+
+    assert resp.status_code == 404
@@ -0,0 +1,67 @@
+from datetime import datetime
+
+import pytest
+from sqlmodel import select
+
+from src.infrastructure import database
+from src.infrastructure.telegram_bot_client import TelegramBotClient
+from src.models.connected_platform import ConnectedPlatform
+from src.models.post import Post, Schedule
+from src.UAA.utils import encrypt_token
+
+
+@pytest.mark.asyncio
+async def test_schedule_batch_stores_offset_times_as_naive_utc(client, user):
+    async with database.get_session() as session:
+        post = Post(user_id=user.id, title="launch", content="hello")
+        cp = ConnectedPlatform(user_id=user.id, provider="telegram", provider_user_id="-100", access_token_enc="x")
+        session.add_all([post, cp])
+        await session.commit()
+
+    resp = await client.post(f"/posts/{post.id}/schedule/batch", json={
+        "connected_platform_ids": [str(cp.id)],
+        "scheduled_times": [
+            "2030-01-01T10:00:00Z",
+            "2030-01-01T10:00:00",  # the same instant, naive: deduped against the "Z" one
+            "2030-01-01T12:00:00+01:00",
+        ],
+    })
+
+    assert resp.status_code == 201, resp.text
+    assert resp.json()["count"] == 2
+    async with database.get_session() as session:
+        stored = sorted((await session.execute(select(Schedule.scheduled_time))).scalars().all())
+    assert stored == [datetime(2030, 1, 1, 10, 0), datetime(2030, 1, 1, 11, 0)]
+    assert all(t.tzinfo is None for t in stored)
+
+
+@pytest.mark.asyncio
+async def test_fan_out_results_are_per_platform_without_bot_token_fallback(client, user, monkeypatch):
+    monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "1:shared")
+    sent = []
+
+    async def publish_to_chats(self, title, content, media_path, chat_ids):
+        sent.append((self.bot_token, chat_ids))
+        return {chat_id: (f"{self.bot_id}-msg", None) for chat_id in chat_ids}
+
+    monkeypatch.setattr(TelegramBotClient, "publish_to_chats", publish_to_chats)
+    async with database.get_session() as session:
+        post = Post(user_id=user.id, title="launch", content="hello")
+        bot_a, bot_b, no_token = (
+            ConnectedPlatform(user_id=user.id, provider="telegram", provider_user_id="-100", access_token_enc=encrypt_token("7:a")),
+            ConnectedPlatform(user_id=user.id, provider="telegram", provider_user_id="-100", access_token_enc=encrypt_token("8:b")),
+            # ciphertext no configured key decrypts
+            ConnectedPlatform(user_id=user.id, provider="telegram", provider_user_id="-200", access_token_enc="not-a-fernet-token"),
+        )
+        session.add_all([post, bot_a, bot_b, no_token])
+        await session.commit()
+
+    resp = await client.post(f"/posts/{post.id}/publish/telegram", json={})
+
+    assert resp.status_code == 200, resp.text
+    results = {r["connected_platform_id"]: r for r in resp.json()["results"]}
+    assert results[str(bot_a.id)]["message_id"] == "7-msg"
+    assert results[str(bot_b.id)]["message_id"] == "8-msg"
+    assert results[str(no_token.id)]["status"] == "failed"
+    assert results[str(no_token.id)]["error"] == "bot token unavailable"
+    assert sorted(sent) == [("7:a", ["-100"]), ("8:b", ["-100"])]
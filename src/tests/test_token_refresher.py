@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import select
+
+from src.infrastructure import database
+from src.infrastructure.platforms_repo import PlatformsRepository
+from src.models.connected_platform import ConnectedPlatform
+from src.services import token_refresher as token_refresher_module
+from src.services.token_refresher import TokenRefresher
+from src.UAA.utils import encrypt_token
+
+
+@pytest.fixture
+def refresher(db, fake_redis, monkeypatch):
+    monkeypatch.setattr(token_refresher_module, "redis_client", fake_redis)
+    calls = []
+
+    async def refresh(access_token, refresh_token):
+        calls.append(refresh_token)
+        return {"access_token": f"access-{len(calls)}", "refresh_token": f"refresh-{len(calls)}", "expires_in": 3600}
+
+    worker = TokenRefresher(refreshers={"instagram": refresh}, jitter_seconds=0)
+    worker.calls = calls
+    return worker
+
+
+async def _expiring_platform(user) -> ConnectedPlatform:
+    async with database.get_session() as session:
+        cp = ConnectedPlatform(
+            user_id=user.id,
+            provider="instagram",
+            access_token_enc=encrypt_token("access-0"),
+            refresh_token_enc=encrypt_token("refresh-0"),
+            token_expires_at=datetime.utcnow() + timedelta(hours=1),
+        )
+        session.add(cp)
+        await session.commit()
+    return cp
+
+
+@pytest.mark.asyncio
+async def test_refresh_skips_row_changed_after_scan(refresher, user):
+    scanned = await _expiring_platform(user)
+
+    await refresher.run_once()
+    assert refresher.calls == ["refresh-0"]
+    assert refresher.stats["refreshed"] == 1
+
+    # a worker still holding the pre-refresh row must not call the provider with the
+    # rotated refresh token
+    assert await refresher._refresh_one(scanned) is None
+    assert refresher.calls == ["refresh-0"]
+    assert refresher.stats["skipped_stale"] == 1
+
+
+@pytest.mark.asyncio
+async def test_update_tokens_many_reports_only_rows_written(refresher, user):
+    fresh = await _expiring_platform(user)
+    stale = await _expiring_platform(user)
+    async with database.get_session() as session:
+        await PlatformsRepository(session).update_tokens(stale, "other", None, None)
+
+    async with database.get_session() as session:
+        written = await PlatformsRepository(session).update_tokens_many([
+            (fresh, "a", None, None),
+            (stale, "b", None, None),
+        ])
+
+    assert written == [fresh.id]
+    async with database.get_session() as session:
+        tokens = dict((await session.execute(select(ConnectedPlatform.id, ConnectedPlatform.access_token_enc))).all())
+    assert tokens == {fresh.id: "a", stale.id: "other"}